@@ -1,7 +1,10 @@
 import os
 import sys
 import json
+import time
+import queue
 import argparse
+import threading
 import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
@@ -14,7 +17,9 @@ load_dotenv()
 # Import project config
 try:
     from src.common.config import Config
+    from src.common.redis_client import get_shared_client
 except ImportError:
+    get_shared_client = None
     # Fallback if running from different directory
     class Config:
         REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
@@ -24,7 +29,18 @@ except ImportError:
         KEY_BANNED = "sim:banned"
         KEY_GAME_STATE = "sim:state"
         KEY_IDENTITY = "sim:identity"
+        KEY_USER_IDS = "sim:ids"
+        KEY_STREAM = "money_flow"
+        KEY_ALERTS = "governor:alerts"
         TOTAL_TICKS = 200
+        VIZ_LAYOUT = os.getenv("VIZ_LAYOUT", "auto")
+        VIZ_LAYOUT_REFINE = 5
+        VIZ_LAYOUT_GRID_NODES = 2000
+
+try:
+    from src.common.tx_codec import PACKED_FIELD, decode_tx
+except ImportError:
+    PACKED_FIELD, decode_tx = None, None
 
 # Redis
 try:
@@ -42,6 +58,141 @@ except ImportError:
     PLOTLY_AVAILABLE = False
 
 
+def grid_force_layout(G, pos, k=None, iterations=50, leaf_size=16, step=0.1):
+    """
+    Fruchterman-Reingold layout with Barnes-Hut style grid repulsion.
+    
+    Repulsion comes from _grid_repulsion (exact between nearby nodes,
+    centre-of-mass approximations for far cells), so an iteration costs
+    about O(n log n) time and O(n) memory instead of O(n^2). Attraction
+    along edges is exact. Starts from pos (all nodes) and returns positions
+    rescaled to [-1, 1] like nx.spring_layout; step is the largest first
+    move as a fraction of the layout size (keep it small when refining a
+    previous layout).
+    """
+    nodes = list(G)
+    n = len(nodes)
+    if n < 2:
+        return {v: np.zeros(2) for v in nodes}
+    
+    index = {v: i for i, v in enumerate(nodes)}
+    P = np.array([pos[v] for v in nodes], dtype=float)
+    src = np.fromiter((index[u] for u, _ in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    dst = np.fromiter((index[v] for _, v in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    k = k or 1.0 / np.sqrt(n)
+    
+    t = max(np.ptp(P[:, 0]), np.ptp(P[:, 1])) * step
+    dt = t / (iterations + 1)
+    for _ in range(iterations):
+        disp = _grid_repulsion(P, k, leaf_size)
+        
+        delta = P[src] - P[dst]
+        pull = delta * np.sqrt((delta ** 2).sum(axis=1))[:, None] / k
+        np.add.at(disp, src, -pull)
+        np.add.at(disp, dst, pull)
+        
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 0.01)
+        P += disp * (np.minimum(length, t) / length)[:, None]
+        t -= dt
+    
+    return dict(zip(nodes, nx.rescale_layout(P)))
+
+
+def _grid_repulsion(P, k, leaf_size=16, max_depth=16):
+    """
+    Fruchterman-Reingold repulsion (k^2 / d per pair) for positions P (n x 2).
+    
+    The bounding square is split into 2^l x 2^l grids, l = 1, 2, ... until
+    no occupied cell holds more than leaf_size nodes. At every level a cell
+    is pushed, as a whole, by the centres of mass of the cells that are
+    children of its parent's neighbours but not its own neighbours; nodes
+    in the same or adjacent leaf cells repel exactly. Every node pair is
+    counted once. Only occupied cells are stored, so clustered layouts
+    just add levels.
+    """
+    n = len(P)
+    lo = P.min(axis=0)
+    span = max(np.ptp(P[:, 0]), np.ptp(P[:, 1]), 1e-9) * (1 + 1e-9)
+    U = (P - lo) / span
+    disp = np.zeros((n, 2))
+    kk = k * k
+    
+    for depth in range(1, max_depth + 1):
+        res = 1 << depth
+        ixy = (U * res).astype(np.int64)
+        keys, inv, counts = np.unique(ixy[:, 0] * res + ixy[:, 1], return_inverse=True, return_counts=True)
+        cx, cy = keys // res, keys % res
+        leaf = depth == max_depth or (depth >= 2 and counts.max() <= leaf_size)
+        if depth < 2:
+            continue
+        
+        # Far field, cell to cell: the 6 x 6 children of the parent's 3 x 3
+        # neighbourhood, minus the cell's own 3 x 3 neighbourhood
+        centres = np.stack([np.bincount(inv, weights=P[:, 0]), np.bincount(inv, weights=P[:, 1])], axis=1) / counts[:, None]
+        force = np.zeros((len(keys), 2))
+        for a in range(6):
+            for b in range(6):
+                rows, cols = _cell_pairs(keys, cx, cy, res, 2 * (cx // 2) - 2 + a, 2 * (cy // 2) - 2 + b, far=True)
+                d = centres[rows] - centres[cols]
+                force[rows] += d * (counts[cols] * kk / np.maximum((d ** 2).sum(axis=1), 1e-4))[:, None]
+        disp += force[inv]
+        
+        if leaf:
+            break
+    
+    # Near field, node to node: own and adjacent leaf cells
+    order = np.argsort(inv, kind="stable")
+    starts = np.cumsum(counts) - counts
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            rows, cols = _cell_pairs(keys, cx, cy, res, cx + dx, cy + dy)
+            target = np.full(len(keys), -1)
+            target[rows] = cols
+            node_target = target[inv]
+            i = np.flatnonzero(node_target >= 0)
+            cnt = counts[node_target[i]]
+            # Every (node, node in that cell) pair, via the cell-sorted order
+            pi = np.repeat(i, cnt)
+            offs = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+            pj = order[np.repeat(starts[node_target[i]], cnt) + offs]
+            keep = pi != pj
+            pi, pj = pi[keep], pj[keep]
+            d = P[pi] - P[pj]
+            f = d * (kk / np.maximum((d ** 2).sum(axis=1), 1e-4))[:, None]
+            disp[:, 0] += np.bincount(pi, weights=f[:, 0], minlength=n)
+            disp[:, 1] += np.bincount(pi, weights=f[:, 1], minlength=n)
+    return disp
+
+
+def _cell_pairs(keys, cx, cy, res, tx, ty, far=False):
+    """(cell, occupied target cell) index pairs for per-cell targets (tx, ty); far drops adjacent targets."""
+    ok = (tx >= 0) & (tx < res) & (ty >= 0) & (ty < res)
+    if far:
+        ok &= (np.abs(tx - cx) > 1) | (np.abs(ty - cy) > 1)
+    rows = np.flatnonzero(ok)
+    tkey = tx[rows] * res + ty[rows]
+    cols = np.minimum(np.searchsorted(keys, tkey), len(keys) - 1)
+    hit = keys[cols] == tkey
+    return rows[hit], cols[hit]
+
+
+def edge_segments(P, src, dst):
+    """
+    Line coordinates for edges src[i] -> dst[i] over node positions P (n x 2):
+    float32 x/y arrays of (start, end, NaN) triples. Plotly serialises them as
+    base64 typed arrays and NaN breaks the line like None does.
+    """
+    xy = np.full((len(src), 3, 2), np.nan, dtype=np.float32)
+    xy[:, 0] = P[src]
+    xy[:, 1] = P[dst]
+    xy = xy.reshape(-1, 2)
+    return xy[:, 0], xy[:, 1]
+
+
+# Columns of the per-node aggregate table (TransactionGraphVisualizer.node_stats)
+IN_VOL, OUT_VOL, IN_DEG, OUT_DEG, FRAUD_EDGES = range(5)
+
+
 class TransactionGraphVisualizer:
     """Visualizes transaction network from Redis."""
     
@@ -63,19 +214,101 @@ class TransactionGraphVisualizer:
         'FRAUD': '#e74c3c',
     }
     
-    def __init__(self):
-        """Initialize using project Config."""
+    # Slider / play handling for write_animation; {frames} is the frame table
+    ANIMATION_SCRIPT = """
+var gd = document.getElementById('{plot_id}');
+var A = {frames};
+var shown = 0, timer = null;
+function show(i) {
+    var colors = A.base.slice();
+    for (var f = 1; f <= i; f++) {
+        var c = A.changes[f];
+        for (var j = 0; j < c.length; j += 2) colors[c[j]] = A.palette[c[j + 1]];
+    }
+    var visible = A.edges.map(function(t, f) { return f <= i; }).concat([true]);
+    var color = A.edges.map(function() { return null; }).concat([colors]);
+    Plotly.restyle(gd, {'visible': visible, 'marker.color': color}, A.edges.concat([A.nodes]));
+    shown = i;
+}
+gd.on('plotly_sliderchange', function(e) { show(e.step._index); });
+gd.on('plotly_buttonclicked', function() {
+    if (timer) { clearInterval(timer); timer = null; return; }
+    var i = shown >= A.edges.length - 1 ? -1 : shown;
+    timer = setInterval(function() {
+        i += 1;
+        if (i >= A.edges.length) { clearInterval(timer); timer = null; return; }
+        Plotly.relayout(gd, {'sliders[0].active': i});
+        show(i);
+    }, 300);
+});
+"""
+    
+    def __init__(self, key_prefix=""):
+        """Initialize using project Config; key_prefix selects one game's keys."""
+        self.key_prefix = key_prefix
         self.redis_client = None
         self.G = nx.DiGraph()
         self.node_types = {}
         self.banned_nodes = set()
         self.identity_map = {}
+        self.wire_names = {}  # Interned ID -> user ID for packed stream entries
         
         self.detected_cycles = []
         self.detected_triangles = []
         self.smurfing_hubs = []
         
         self.stats = defaultdict(float)
+        
+        # node -> [in volume, out volume, in degree, out degree, FRAUD edges],
+        # kept up to date as entries are added (degrees count distinct edges)
+        self.node_stats = {}
+        self.edge_order = []  # (sender, receiver) in the order edges first appeared
+        self.frames = []      # (label, edges, [(node, type) changed]) per recorded frame
+        self._frame_types = {}  # node -> type as of the last recorded frame
+        
+        # Seconds per stage of the last snapshot, and running totals
+        self.timings = {}
+        self.timing_totals = defaultdict(float)
+        self.snapshots = 0
+        
+        # Tailing state: the graph persists across loads and only entries
+        # after last_stream_id / alerts newer than _last_alert are read
+        self.last_stream_id = "0-0"
+        self._last_alert = None
+        
+        # Layout cache: positions from the previous snapshot seed the next one
+        self.pos = {}
+        self._rng = np.random.default_rng(42)
+    
+    def reset(self):
+        """Forget everything loaded so far (e.g. the stream was reset for a new game)."""
+        self.G = nx.DiGraph()
+        self.node_types = {}
+        self.banned_nodes = set()
+        self.identity_map = {}
+        self.wire_names = {}
+        self.detected_cycles = []
+        self.detected_triangles = []
+        self.smurfing_hubs = []
+        self.stats = defaultdict(float)
+        self.node_stats = {}
+        self.edge_order = []
+        self.frames = []
+        self._frame_types = {}
+        self.last_stream_id = "0-0"
+        self._last_alert = None
+        self.pos = {}
+    
+    def refresh(self):
+        """Bring graph, identities, bans and alerts up to date; False if there is no data."""
+        t0 = time.perf_counter()
+        if not self.load_from_stream():
+            return False
+        self.load_identity_map()
+        self.load_banned_nodes()
+        self.load_fraud_alerts()
+        self.timings = {'load': time.perf_counter() - t0}
+        return True
     
     def connect_redis(self):
         """Connect to Redis using project Config."""
@@ -84,12 +317,16 @@ class TransactionGraphVisualizer:
             return False
         
         try:
-            self.redis_client = redis.Redis(
-                host=Config.REDIS_HOST,
-                port=Config.REDIS_PORT,
-                db=0,
-                decode_responses=True
-            )
+            if get_shared_client:
+                # Shared pool: repeated snapshots reuse the same sockets
+                self.redis_client = get_shared_client()
+            else:
+                self.redis_client = redis.Redis(
+                    host=Config.REDIS_HOST,
+                    port=Config.REDIS_PORT,
+                    db=0,
+                    decode_responses=True
+                )
             self.redis_client.ping()
             print(f"✅ Connected to Redis at {Config.REDIS_HOST}:{Config.REDIS_PORT}")
             return True
@@ -103,8 +340,13 @@ class TransactionGraphVisualizer:
             return
         
         try:
-            identity_data = self.redis_client.hgetall(Config.KEY_IDENTITY)
+            key = self.key_prefix + Config.KEY_IDENTITY
+            # Identities are only ever added: re-read the hash only when it grew
+            if self.redis_client.hlen(key) == len(self.identity_map):
+                return
+            identity_data = self.redis_client.hgetall(key)
             self.identity_map = {k: v.lower() for k, v in identity_data.items()}
+            self.node_types = {}
             print(f"👤 Loaded {len(self.identity_map)} user identities")
         except Exception as e:
             print(f"⚠️  Could not load identities: {e}")
@@ -115,64 +357,141 @@ class TransactionGraphVisualizer:
             return
         
         try:
-            self.banned_nodes = self.redis_client.smembers(Config.KEY_BANNED)
+            key = self.key_prefix + Config.KEY_BANNED
+            # Bans are only ever added: re-read the set only when it grew
+            if self.redis_client.scard(key) == len(self.banned_nodes):
+                return
+            self.banned_nodes = self.redis_client.smembers(key)
+            self.node_types = {}
             if self.banned_nodes:
                 print(f"🚫 Loaded {len(self.banned_nodes)} banned nodes")
         except Exception as e:
             print(f"⚠️  Could not load banned nodes: {e}")
     
-    def load_from_stream(self, stream_name='money_flow', max_count=50000):
-        """Load transactions from Redis stream."""
+    def load_from_stream(self, stream_name=None, max_count=50000):
+        """
+        Add transactions written since the last call to the graph.
+        
+        The stream is tailed with XREAD from last_stream_id in pages of
+        max_count, so a load costs the activity since the previous one
+        rather than the whole history.
+        """
+        stream_name = stream_name or self.key_prefix + Config.KEY_STREAM
         if not self.redis_client:
             if not self.connect_redis():
                 return False
         
         try:
-            entries = self.redis_client.xrange(stream_name, count=max_count)
+            new_count = 0
+            while True:
+                res = self.redis_client.xread({stream_name: self.last_stream_id}, count=max_count)
+                entries = res[0][1] if res else []
+                if not entries:
+                    break
+                self._add_entries(entries)
+                self.last_stream_id = entries[-1][0]
+                new_count += len(entries)
+                if len(entries) < max_count:
+                    break
+            
+            if not new_count and self.last_stream_id != "0-0" and not self.redis_client.exists(stream_name):
+                # Stream deleted under us (simulation reset): start a fresh graph
+                self.reset()
             
-            if not entries:
+            if self.G.number_of_nodes() == 0:
                 print(f"⚠️  No transactions in stream '{stream_name}'")
                 return False
             
-            print(f"📊 Loading {len(entries)} transactions...")
-            
-            for entry_id, data in entries:
-                sender = data.get('sender_id', 'unknown')
-                receiver = data.get('receiver_id', 'unknown')
-                amount = float(data.get('amount', 0))
-                tx_type = data.get('type', 'CIVIL')
-                
-                if sender not in self.G:
-                    self.G.add_node(sender)
-                if receiver not in self.G:
-                    self.G.add_node(receiver)
-                
-                if self.G.has_edge(sender, receiver):
-                    self.G[sender][receiver]['weight'] += amount
-                    self.G[sender][receiver]['count'] += 1
-                else:
-                    self.G.add_edge(sender, receiver, weight=amount, count=1, tx_type=tx_type)
-                
-                self.stats['total_transactions'] += 1
-                self.stats['total_volume'] += amount
-                if tx_type == 'FRAUD':
-                    self.stats['fraud_transactions'] += 1
-                    self.stats['fraud_volume'] += amount
-            
-            print(f"✅ Loaded: {self.G.number_of_nodes()} nodes, {self.G.number_of_edges()} edges")
+            if new_count:
+                self.node_types = {}
+            print(f"📊 Loaded {new_count} new transactions: "
+                  f"{self.G.number_of_nodes()} nodes, {self.G.number_of_edges()} edges")
             return True
             
         except Exception as e:
             print(f"❌ Error: {e}")
             return False
     
-    def load_fraud_alerts(self, channel='governor:alerts'):
+    def _add_entries(self, entries):
+        """Fold stream entries into the graph, the node table and running stats."""
+        table = self.node_stats
+        for entry_id, data in entries:
+            # Skip malformed entries (like Governor.ingest) so one bad entry
+            # cannot pin last_stream_id and fail every later refresh
+            try:
+                if PACKED_FIELD and PACKED_FIELD in data:
+                    _, amount, s_id, r_id, tx_type = decode_tx(data[PACKED_FIELD])
+                    sender = self._wire_name(s_id)
+                    receiver = self._wire_name(r_id)
+                else:
+                    sender = data.get('sender_id', 'unknown')
+                    receiver = data.get('receiver_id', 'unknown')
+                    amount = float(data.get('amount', 0))
+                    tx_type = data.get('type', 'CIVIL')
+            except (ValueError, KeyError, IndexError):
+                continue
+            
+            if sender not in self.G:
+                self.G.add_node(sender)
+                table[sender] = [0.0, 0.0, 0, 0, 0]
+            if receiver not in self.G:
+                self.G.add_node(receiver)
+                table[receiver] = [0.0, 0.0, 0, 0, 0]
+            s_row, r_row = table[sender], table[receiver]
+            
+            if self.G.has_edge(sender, receiver):
+                self.G[sender][receiver]['weight'] += amount
+                self.G[sender][receiver]['count'] += 1
+            else:
+                self.G.add_edge(sender, receiver, weight=amount, count=1, tx_type=tx_type)
+                self.edge_order.append((sender, receiver))
+                s_row[OUT_DEG] += 1
+                r_row[IN_DEG] += 1
+                if tx_type == 'FRAUD':
+                    s_row[FRAUD_EDGES] += 1
+                    r_row[FRAUD_EDGES] += 1
+            s_row[OUT_VOL] += amount
+            r_row[IN_VOL] += amount
+            
+            self.stats['total_transactions'] += 1
+            self.stats['total_volume'] += amount
+            if tx_type == 'FRAUD':
+                self.stats['fraud_transactions'] += 1
+                self.stats['fraud_volume'] += amount
+    
+    def _wire_name(self, wire_id):
+        """Resolve an interned ID from a packed entry, refreshing KEY_USER_IDS on a miss."""
+        name = self.wire_names.get(wire_id)
+        if name is None:
+            self.wire_names = {int(k): v for k, v in self.redis_client.hgetall(self.key_prefix + Config.KEY_USER_IDS).items()}
+            name = self.wire_names.get(wire_id, 'unknown')
+        return name
+    
+    def _new_alerts(self, channel, page=100):
+        """Alerts pushed since the last call, oldest first (the list is newest-first and capped)."""
+        fresh = []
+        start = 0
+        while True:
+            chunk = self.redis_client.lrange(channel, start, start + page - 1)
+            if self._last_alert in chunk:
+                fresh.extend(chunk[:chunk.index(self._last_alert)])
+                break
+            fresh.extend(chunk)
+            if len(chunk) < page:
+                break
+            start += page
+        if fresh:
+            self._last_alert = fresh[0]
+        return fresh[::-1]
+    
+    def load_fraud_alerts(self, channel=None):
         """Load fraud alerts from Governor."""
         if not self.redis_client:
             return
+        channel = channel or self.key_prefix + Config.KEY_ALERTS
         
         try:
-            alerts = self.redis_client.lrange(channel, 0, -1)
+            alerts = self._new_alerts(channel)
             
             for alert_json in alerts:
                 try:
@@ -223,14 +542,10 @@ class TransactionGraphVisualizer:
                     self.node_types[node] = 'civilian'
                 continue
             
-            fraud_edges = sum(1 for _, _, d in self.G.in_edges(node, data=True) 
-                             if d.get('tx_type') == 'FRAUD')
-            fraud_edges += sum(1 for _, _, d in self.G.out_edges(node, data=True) 
-                              if d.get('tx_type') == 'FRAUD')
-            
-            if fraud_edges > 0:
-                out_deg = self.G.out_degree(node)
-                in_deg = self.G.in_degree(node)
+            row = self.node_stats[node]
+            if row[FRAUD_EDGES] > 0:
+                out_deg = row[OUT_DEG]
+                in_deg = row[IN_DEG]
                 
                 if out_deg > in_deg * 3:
                     self.node_types[node] = 'fraud_dirty'
@@ -239,7 +554,7 @@ class TransactionGraphVisualizer:
                 else:
                     self.node_types[node] = 'bot'
             else:
-                vol = sum(d['weight'] for _, _, d in self.G.out_edges(node, data=True))
+                vol = row[OUT_VOL]
                 if vol > 5000:
                     self.node_types[node] = 'entrepreneur'
                 elif vol > 1000:
@@ -263,11 +578,7 @@ class TransactionGraphVisualizer:
         return [min_w + (w - min_wt) / (max_wt - min_wt) * (max_w - min_w) for w in weights]
     
     def get_node_sizes(self, min_s=100, max_s=1000):
-        volumes = {}
-        for node in self.G.nodes():
-            vol = sum(d['weight'] for _, _, d in self.G.in_edges(node, data=True))
-            vol += sum(d['weight'] for _, _, d in self.G.out_edges(node, data=True))
-            volumes[node] = vol
+        volumes = {node: row[IN_VOL] + row[OUT_VOL] for node, row in self.node_stats.items()}
         
         if not volumes or max(volumes.values()) == min(volumes.values()):
             return [300] * self.G.number_of_nodes()
@@ -278,6 +589,44 @@ class TransactionGraphVisualizer:
     
 
     
+    def compute_layout(self, method=None, iterations=50):
+        """
+        Node positions, warm-started from the previous call.
+        
+        Nodes seen before keep their positions and new nodes start next to
+        their already placed neighbours, so after the first snapshot only
+        VIZ_LAYOUT_REFINE iterations are run and the picture stays stable
+        between snapshots. method: "spring", "grid" (grid_force_layout) or
+        "auto" (grid above VIZ_LAYOUT_GRID_NODES nodes).
+        """
+        method = method or Config.VIZ_LAYOUT
+        if method == "auto":
+            method = "grid" if self.G.number_of_nodes() > Config.VIZ_LAYOUT_GRID_NODES else "spring"
+        
+        warm = bool(self.pos)
+        if warm:
+            iterations = Config.VIZ_LAYOUT_REFINE
+        init = self._seed_positions()
+        
+        if method == "grid":
+            self.pos = grid_force_layout(self.G, init, iterations=iterations, step=0.02 if warm else 0.1)
+        else:
+            self.pos = nx.spring_layout(self.G, k=2, iterations=iterations, seed=42, pos=init if warm else None)
+        return self.pos
+    
+    def _seed_positions(self):
+        """Previous positions plus a starting point for every new node."""
+        init = {n: self.pos[n] for n in self.G if n in self.pos}
+        for n in self.G:
+            if n in init:
+                continue
+            placed = [init[m] for m in nx.all_neighbors(self.G, n) if m in init]
+            if placed:
+                init[n] = np.mean(placed, axis=0) + self._rng.normal(0, 0.05, 2)
+            else:
+                init[n] = self._rng.uniform(-1, 1, 2)
+        return init
+    
     def _create_legend_traces(self):
         """Create invisible traces for legend."""
         legend_items = [
@@ -307,7 +656,21 @@ class TransactionGraphVisualizer:
         
         return traces
     
-    def visualize_html(self, output_path='transaction_graph.html'):
+    def _layout_arrays(self, pos):
+        """Node order, float32 positions and edge endpoint indices (edge_order)."""
+        nodes = list(self.G)
+        index = {n: i for i, n in enumerate(nodes)}
+        P = np.array([pos[n] for n in nodes], dtype=np.float32).reshape(-1, 2)
+        src = np.fromiter((index[u] for u, _ in self.edge_order), dtype=np.int64, count=len(self.edge_order))
+        dst = np.fromiter((index[v] for _, v in self.edge_order), dtype=np.int64, count=len(self.edge_order))
+        return nodes, P, src, dst
+    
+    def visualize_html(self, output_path='transaction_graph.html', include_plotlyjs=True):
+        """
+        Write an interactive HTML snapshot. include_plotlyjs is passed to
+        plotly: True embeds plotly.js, 'directory' references one
+        plotly.min.js written next to the file (shared by all snapshots).
+        """
         if not PLOTLY_AVAILABLE:
             print("❌ Plotly not installed. Run: pip install plotly")
             return None
@@ -316,31 +679,29 @@ class TransactionGraphVisualizer:
             print("❌ No data!")
             return None
         
+        t0 = time.perf_counter()
         if not self.node_types:
             self.assign_node_types()
+        tc = time.perf_counter()
         
         print("📐 Computing layout for HTML...")
-        pos = nx.spring_layout(self.G, k=2, iterations=50, seed=42)
+        pos = self.compute_layout()
+        t1 = time.perf_counter()
         
-        edge_x, edge_y = [], []
-        for u, v in self.G.edges():
-            x0, y0 = pos[u]
-            x1, y1 = pos[v]
-            edge_x.extend([x0, x1, None])
-            edge_y.extend([y0, y1, None])
+        nodes, P, src, dst = self._layout_arrays(pos)
+        edge_x, edge_y = edge_segments(P, src, dst)
         
         edge_trace = go.Scatter(x=edge_x, y=edge_y, mode='lines',
                                 line=dict(width=1, color='#888'), hoverinfo='none', opacity=0.5,showlegend=False)
         
-        node_x = [pos[n][0] for n in self.G.nodes()]
-        node_y = [pos[n][1] for n in self.G.nodes()]
+        node_x, node_y = P[:, 0], P[:, 1]
         node_colors = [self.NODE_COLORS.get(self.node_types.get(n, 'unknown'), '#95a5a6') 
                        for n in self.G.nodes()]
         
         node_text = []
         for n in self.G.nodes():
-            vol = sum(d['weight'] for _, _, d in self.G.in_edges(n, data=True))
-            vol += sum(d['weight'] for _, _, d in self.G.out_edges(n, data=True))
+            row = self.node_stats[n]
+            vol = row[IN_VOL] + row[OUT_VOL]
             status = "🚫 BANNED" if n in self.banned_nodes else ""
             node_text.append(f"<b>ID:</b> {n}<br><b>Type:</b> {self.node_types.get(n, '?')}<br>"
                             f"<b>Volume:</b> ${vol:,.0f}<br>{status}")
@@ -384,10 +745,99 @@ class TransactionGraphVisualizer:
             )
         )
         
-        fig.write_html(output_path)
-        print(f"💾 Saved to {output_path}")
+        t2 = time.perf_counter()
+        
+        fig.write_html(output_path, include_plotlyjs=include_plotlyjs)
+        t3 = time.perf_counter()
+        self._record_timings(classify=tc - t0, layout=t1 - tc, traces=t2 - t1, write=t3 - t2)
+        print(f"💾 Saved to {output_path} ({self.format_timings()})")
+        return fig
+    
+    def record_frame(self, label):
+        """Remember the current graph as one frame of write_animation (no layout, no I/O)."""
+        if not self.node_types:
+            self.assign_node_types()
+        # Only new nodes and nodes whose type changed since the previous frame
+        changes = []
+        for n in self.G:
+            t = self.node_types.get(n, 'unknown')
+            if self._frame_types.get(n) != t:
+                self._frame_types[n] = t
+                changes.append((n, t))
+        self.frames.append((label, len(self.edge_order), changes))
+    
+    def write_animation(self, output_path='transaction_graph_animated.html', include_plotlyjs='directory'):
+        """
+        Write all recorded frames into one animated HTML.
+        
+        Nodes use the current layout in every frame. Each frame's new edges
+        are stored once, in their own trace, and each frame lists only the
+        nodes that appeared or changed type. A small script on the slider
+        rebuilds a frame with one restyle: edge traces up to that frame on,
+        node colours replayed from the deltas. The file grows with the graph
+        and its changes, not with frames x graph.
+        """
+        if not PLOTLY_AVAILABLE or not self.frames:
+            return None
+        
+        t0 = time.perf_counter()
+        nodes, P, src, dst = self._layout_arrays(self.compute_layout())
+        index = {n: i for i, n in enumerate(nodes)}
+        palette = sorted(set(self.NODE_COLORS.values())) + ['rgba(0,0,0,0)']
+        colour = {t: palette.index(c) for t, c in self.NODE_COLORS.items()}
+        absent = len(palette) - 1
+        
+        edge_traces = []
+        changes = []
+        start = 0
+        for i, (_, end, delta) in enumerate(self.frames):
+            x, y = edge_segments(P, src[start:end], dst[start:end])
+            edge_traces.append(go.Scatter(x=x, y=y, mode='lines', visible=i == 0, line=dict(width=1, color='#888'),
+                                          hoverinfo='none', opacity=0.5, showlegend=False))
+            changes.append([v for n, t in delta for v in (index[n], colour.get(t, colour['unknown']))])
+            start = end
+        
+        base = [palette[absent]] * len(nodes)
+        for j in range(0, len(changes[0]), 2):
+            base[changes[0][j]] = palette[changes[0][j + 1]]
+        node_trace = go.Scatter(x=P[:, 0], y=P[:, 1], text=nodes, mode='markers', hoverinfo='text', showlegend=False,
+                                marker=dict(size=12, color=base, line=dict(width=1, color='white')))
+        
+        slider = dict(active=0, currentvalue=dict(prefix=''),
+                      steps=[dict(label=f[0], method='skip') for f in self.frames])
+        play = dict(type='buttons', showactive=False, x=0.0, y=0.0, xanchor='right', yanchor='top',
+                    buttons=[dict(label='▶', method='skip')])
+        
+        fig = go.Figure(
+            data=edge_traces + [node_trace] + self._create_legend_traces(),
+            layout=go.Layout(
+                title='Transaction Network Graph',
+                showlegend=True, hovermode='closest',
+                xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                plot_bgcolor='white',
+                sliders=[slider], updatemenus=[play],
+            )
+        )
+        frames = json.dumps({"edges": list(range(len(edge_traces))), "nodes": len(edge_traces),
+                             "palette": palette, "base": base, "changes": changes}, separators=(',', ':'))
+        fig.write_html(output_path, include_plotlyjs=include_plotlyjs,
+                       post_script=self.ANIMATION_SCRIPT.replace('{frames}', frames))
+        print(f"🎞️  Saved {len(self.frames)} frames to {output_path} ({time.perf_counter() - t0:.2f}s)")
         return fig
     
+    def _record_timings(self, **stages):
+        self.timings.update(stages)
+        for stage, seconds in self.timings.items():
+            self.timing_totals[stage] += seconds
+        self.snapshots += 1
+    
+    def format_timings(self, timings=None):
+        """'1.23s = load 0.01 | layout 0.80 | ...' for the last snapshot (or the given dict)."""
+        timings = self.timings if timings is None else timings
+        stages = " | ".join(f"{k} {v:.2f}" for k, v in timings.items())
+        return f"{sum(timings.values()):.2f}s = {stages}"
+    
     def print_summary(self):
         """Print summary."""
         print("\n" + "=" * 60)
@@ -403,16 +853,106 @@ class TransactionGraphVisualizer:
         print("=" * 60 + "\n")
 
 
+class SnapshotRenderer:
+    """
+    Renders snapshots on a background thread so the game loop never waits on
+    Redis reads, layout or write_html.
+    
+    The thread owns one TransactionGraphVisualizer. Requests go through a
+    queue of max_pending entries; when rendering falls behind, the oldest
+    pending snapshot is dropped in favour of the newer one (nothing is lost:
+    the visualizer tails the stream, so the next render catches up). A
+    snapshot shows the state when its rendering starts. close() waits for
+    everything still queued, so the final snapshot is always written.
+    
+    Snapshot files share one plotly.min.js in output_dir. With animate=True
+    turns are recorded as frames instead of per-turn files, and the final
+    render also writes them into transaction_graph_animated.html.
+    """
+    
+    def __init__(self, output_dir="graph_snapshots", key_prefix="", max_pending=1, animate=False):
+        self.output_dir = output_dir
+        self.animate = animate
+        self.viz = TransactionGraphVisualizer(key_prefix=key_prefix)
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.rendered = 0
+        self.dropped = 0
+        self._thread = None
+    
+    def submit(self, turn_number=None, final=False):
+        """Queue a snapshot without blocking; a stale pending one makes room."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="snapshots", daemon=True)
+            self._thread.start()
+        job = (turn_number, final)
+        while True:
+            try:
+                self.queue.put_nowait(job)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+    
+    def close(self, timeout=None):
+        """Stop after the queued snapshots are written; returns False on timeout."""
+        if self._thread is None:
+            return True
+        self.queue.put(None)
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+    
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            self.render(*job)
+    
+    def render(self, turn_number=None, final=False):
+        try:
+            viz = self.viz
+            if not viz.refresh():
+                return
+            
+            os.makedirs(self.output_dir, exist_ok=True)
+            
+            if final:
+                html_path = f"{self.output_dir}/transaction_graph_final.html"
+                print(f"\n📊 Generating FINAL visualization...")
+                viz.visualize_html(html_path, include_plotlyjs='directory')
+                print(f"   🌐 {html_path}")
+                if self.animate:
+                    viz.record_frame("Final")
+                    viz.write_animation(f"{self.output_dir}/transaction_graph_animated.html")
+                n = viz.snapshots or 1
+                print(f"   ⏱️  {viz.snapshots} snapshots ({self.dropped} dropped), mean "
+                      f"{viz.format_timings({k: v / n for k, v in viz.timing_totals.items()})}")
+            elif self.animate:
+                viz.record_frame(f"Turn {turn_number}")
+            else:
+                html_path = f"{self.output_dir}/graph_turn_{turn_number:03d}.html"
+                viz.visualize_html(html_path, include_plotlyjs='directory')
+                print(f"📸 Snapshot: {html_path} ({viz.format_timings()})")
+            self.rendered += 1
+        
+        except Exception as e:
+            print(f"⚠️  Visualization error: {e}")
+
+
 def main():
     parser = argparse.ArgumentParser(description='Visualize fraud simulation transaction graph')
     parser.add_argument('--output', choices=['screen', 'html', 'all'], default='screen')
     parser.add_argument('--layout', choices=['spring', 'kamada_kawai', 'circular'], default='spring')
     parser.add_argument('--no-labels', action='store_true')
     parser.add_argument('--no-highlight', action='store_true')
+    parser.add_argument('--prefix', default='', help='Redis key prefix of the game to show (e.g. game:3:)')
     
     args = parser.parse_args()
     
-    viz = TransactionGraphVisualizer()
+    viz = TransactionGraphVisualizer(key_prefix=args.prefix)
     
     if viz.load_from_stream():
         viz.load_identity_map()
@@ -1,11 +1,8 @@
 import numpy as np
-import redis
 from ripser import ripser
+from scipy import sparse
 from datetime import datetime
-import os
-from collections import deque
 from dotenv import load_dotenv
-from collections import Counter
 
 load_dotenv()
 
@@ -14,78 +11,133 @@ try:
 except ImportError:
     import config as Config
 
+try:
+    from src.common.tx_codec import PACKED_FIELD, UserIdTable, decode_tx
+except ImportError:
+    from tx_codec import PACKED_FIELD, UserIdTable, decode_tx
+
+try:
+    from src.blue_team.window_graph import WindowGraph
+    from src.blue_team.triangles import find_directed_triangles
+    from src.blue_team.tx_window import TransactionWindow
+except ImportError:
+    from window_graph import WindowGraph
+    from triangles import find_directed_triangles
+    from tx_window import TransactionWindow
+
 class Governor:
-    def __init__(self):
-        self.memory = deque() 
+    def __init__(self, wire_names=None):
+        # Columnar window of (epoch ms, amount, sender, receiver) rows
+        self.memory = TransactionWindow()
         self.window_size = (Config.TOTAL_TICKS * Config.TICK_DURATION)
-
-    def transactions_analyzer(self, new_data: list[dict]):
+        # Persistent graph of the window over interned user IDs, kept in sync with self.memory
+        self.graph = WindowGraph()
+        self.users = UserIdTable()  # external user ID <-> interned int32
+        # Packed stream entries carry the simulator's interned IDs; this maps
+        # them (list or dict) back to external user IDs
+        self.wire_names = wire_names if wire_names is not None else {}
+        self._wire_to_local = {}
+
+    def _intern(self, user):
+        return self.users.intern(user)[0]
+
+    def _intern_wire(self, wire_id):
+        uid = self._wire_to_local.get(wire_id)
+        if uid is None:
+            uid = self._wire_to_local[wire_id] = self._intern(self.wire_names[wire_id])
+        return uid
+
+    def transactions_analyzer(self, new_data: list[dict], now_ms=None):
+        # now_ms: current simulation time; defaults to the newest tx stamp
+        self.ingest(new_data, now_ms)
+        return self.analyze()
+
+    def ingest(self, new_data: list[dict], now_ms=None):
+        """Add stream entries to the window and evict expired rows, without analysing."""
+        epochs, amounts, senders, receivers = [], [], [], []
         for d in new_data:
+            if PACKED_FIELD in d:
+                try:
+                    epoch_ms, amount, sender, receiver, _ = decode_tx(d[PACKED_FIELD])
+                    sender, receiver = self._intern_wire(sender), self._intern_wire(receiver)
+                except (ValueError, KeyError, IndexError):
+                    continue
+                epochs.append(epoch_ms)
+                amounts.append(amount)
+                senders.append(sender)
+                receivers.append(receiver)
+                continue
+            # Parse the whole row first so a bad field never leaves the columns uneven
             try:
                 dt_obj = datetime.strptime(d['timestamp'], "%Y-%m-%d %H:%M:%S")
-                epoch = dt_obj.timestamp()
-                entry = d.copy()
-                entry['epoch'] = epoch
-                self.memory.append(entry)
-            except ValueError:
+                amount = float(d['amount'])
+                sender_id, receiver_id = d['sender_id'], d['receiver_id']
+            except (ValueError, KeyError):
                 continue
-
-        if not self.memory:
-            return [], [], []
-
-        current_sim_time = self.memory[-1]['epoch']
-        while self.memory and (current_sim_time - self.memory[0]['epoch'] > self.window_size):
-            self.memory.popleft()
-
-        recent_data = list(self.memory)
-
-        if len(recent_data) < 5:
+            epochs.append(int(dt_obj.timestamp() * 1000))
+            amounts.append(amount)
+            senders.append(self._intern(sender_id))
+            receivers.append(self._intern(receiver_id))
+
+        if epochs:
+            start = self.memory.append(epochs, amounts, senders, receivers)
+            for sender, receiver, amount in self.memory.rows(start, self.memory.tail):
+                self.graph.add(sender, receiver, amount)
+
+        if not len(self.memory):
+            return
+
+        now_ms = self.memory.latest_epoch if now_ms is None else max(now_ms, self.memory.latest_epoch)
+        cutoff = now_ms - int(self.window_size * 1000)
+        start, stop = self.memory.evict_older_than(cutoff)
+        for sender, receiver, amount in self.memory.rows(start, stop):
+            self.graph.remove(sender, receiver, amount)
+
+    def analyze(self):
+        """Run layering / smurfing / structuring detection over the current window."""
+        if len(self.memory) < 5:
             return [], [], []
 
-        user_volumes = Counter()
-        users_set = set()
-        
-        for d in recent_data:
-            amt = float(d['amount'])
-            user_volumes[d['sender_id']] += amt
-            user_volumes[d['receiver_id']] += amt
-            users_set.add(d['sender_id'])
-            users_set.add(d['receiver_id'])
-
-        unique_users = list(users_set)
+        names = self.users.names
+        user_volumes = self.graph.user_volumes
+        unique_users = list(self.graph.user_tx_count)
         N = len(unique_users)
         user_to_idx = {u: i for i, u in enumerate(unique_users)}
 
-        dist_matrix = np.full((N, N), np.inf)
-        np.fill_diagonal(dist_matrix, 0)
         epsilon = 1e-10
-
-        all_transaction_pairs = [
-            tuple(sorted((d['sender_id'], d['receiver_id'])))
-            for d in recent_data
-        ]
-        adjacency_matrix = np.zeros((N, N), dtype=int)
-        np.fill_diagonal(adjacency_matrix, 0)
-        
-        counts = Counter(all_transaction_pairs)
-
-        for d in recent_data:
-            i = user_to_idx[d['sender_id']]
-            j = user_to_idx[d['receiver_id']]
-            amount = float(d['amount'])
-            
-            distance = 1.0 / (amount + epsilon)
-            dist_matrix[i][j] = min(dist_matrix[i][j], distance)
-            dist_matrix[j][i] = min(dist_matrix[j][i], distance)
-            
-            pair_key = tuple(sorted((d['sender_id'], d['receiver_id'])))
-            frequency = counts[pair_key]
-            if amount > 2000:
-                adjacency_matrix[i][j] = 1
-            elif amount > 300 and frequency >= 3:
-                adjacency_matrix[i][j] = 1
-            elif amount > 100 and frequency >= 6:
-                adjacency_matrix[i][j] = 1
+        # Sparse distances: missing entries mean "no edge" to ripser, so
+        # memory follows the number of distinct pairs instead of N^2
+        pair_distances = {}
+
+        # Sparse adjacency: only the (i, j) pairs that pass the structuring rules
+        adjacent_edges = []
+
+        # One pass over distinct edges instead of every tx in the window
+        for (sender, receiver), edge in self.graph.edges.items():
+            i = user_to_idx[sender]
+            j = user_to_idx[receiver]
+
+            if i != j:
+                distance = 1.0 / (edge.max_amount + epsilon)
+                key = (i, j) if i < j else (j, i)
+                if distance < pair_distances.get(key, np.inf):
+                    pair_distances[key] = distance
+
+            frequency = self.graph.pair_counts[self.graph.pair_key(sender, receiver)]
+            if edge.over_2000:
+                adjacent_edges.append((i, j))
+            elif edge.over_300 and frequency >= 3:
+                adjacent_edges.append((i, j))
+            elif edge.over_100 and frequency >= 6:
+                adjacent_edges.append((i, j))
+
+        rows = np.fromiter((k[0] for k in pair_distances), dtype=np.int32, count=len(pair_distances))
+        cols = np.fromiter((k[1] for k in pair_distances), dtype=np.int32, count=len(pair_distances))
+        dists = np.fromiter(pair_distances.values(), dtype=np.float64, count=len(pair_distances))
+        dist_matrix = sparse.coo_matrix(
+            (np.concatenate([dists, dists]), (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+            shape=(N, N)
+        )
 
         result = ripser(dist_matrix, distance_matrix=True, maxdim=1, do_cocycles=True)
         h1_features = result['dgms'][1]
@@ -95,28 +147,20 @@ class Governor:
         big_fish_net = []
         triangle_cases = []
 
-        user_outgoing = Counter()
-        user_outgoing_volume = Counter()
-
-        for d in recent_data:
-            if float(d['amount']) > 100:
-                user_outgoing[d['sender_id']] += 1
-                user_outgoing_volume[d['sender_id']] += float(d['amount'])
-
+        # Hub / fan-out checks are lookups into the window graph's sender index
         smurfing_suspects = []
-        for user, tx_count in user_outgoing.items():
+        for user, tx_count in self.graph.outgoing_count.items():
             if tx_count > 12:
-                total_sent = user_outgoing_volume[user]
-                recipients = set([d['receiver_id'] for d in recent_data 
-                        if d['sender_id'] == user and float(d['amount']) > 100])
+                total_sent = self.graph.outgoing_volume[user]
+                recipients = [r for r, edge in self.graph.out_edges[user].items() if edge.over_100]
                 
                 if len(recipients) > 7:
                     avg_per_recipient = total_sent / len(recipients) if len(recipients) > 0 else 0
                     if avg_per_recipient > 3000:
                         for recipient in recipients:
                             smurfing_suspects.append({
-                            "user": recipient,
-                            "hub": user,
+                            "user": names[recipient],
+                            "hub": names[user],
                             "tx_count": tx_count,
                             "recipient_count": len(recipients),
                             "total_volume": total_sent
@@ -139,18 +183,16 @@ class Governor:
                 if total_cycle_volume < min_volume:
                     continue
                      
-                cycle_txs = [d for d in recent_data 
-                     if d['sender_id'] in involved_users 
-                     and d['receiver_id'] in involved_users]
+                # Edge-index lookup: cost follows cycle size, not window size
+                amounts = self.graph.amounts_between(set(involved_users))
         
-                if cycle_txs:
+                if amounts.size:
                     # Require minimum transaction count (fraud cycles have many txs)
-                    if len(cycle_txs) < 5:
+                    if amounts.size < 5:
                         continue
                     
-                    amounts = [float(d['amount']) for d in cycle_txs]
-                    avg_amount = sum(amounts) / len(amounts)
-                    std_dev = (sum((x - avg_amount)**2 for x in amounts) / len(amounts)) ** 0.5
+                    avg_amount = amounts.mean()
+                    std_dev = amounts.std()
                     cv = std_dev / avg_amount if avg_amount > 0 else 0
             
                     if cv > 0.3:  # Tightened from 0.5 (fraud patterns are consistent)
@@ -159,25 +201,30 @@ class Governor:
                 suspicious_cases.append({
                     "type": "Layering",
                     "persistence": persistence,
-                    "users": involved_users,
+                    "users": [names[u] for u in involved_users],
                     "volume": total_cycle_volume
                 })
 
-        adjacency_square = np.dot(adjacency_matrix, adjacency_matrix)
-        adjacency_cube = np.dot(adjacency_square, adjacency_matrix)
-        seen_triangles = set()
-
-        if adjacency_cube.diagonal().sum() > 0:
-            triangle_indices = np.where(adjacency_cube.diagonal() > 0)[0]
-            for idx in triangle_indices:
-                for j in range(N):
-                    if adjacency_matrix[idx][j] == 1 and adjacency_square[j][idx] > 0:
-                        for k in range(N):
-                            if adjacency_matrix[j][k] == 1 and adjacency_matrix[k][idx] == 1:
-                                triangle_users = [unique_users[idx], unique_users[j], unique_users[k]]
-                                current_triangle = tuple(sorted(triangle_users))
-                                if current_triangle not in seen_triangles:
-                                    seen_triangles.add(current_triangle)
-                                    triangle_cases.append({"type": "Triangle", "users": triangle_users})
-
-        return suspicious_cases, big_fish_net, triangle_cases
\ No newline at end of file
+        for idx, j, k in find_directed_triangles(adjacent_edges):
+            triangle_users = [names[unique_users[idx]], names[unique_users[j]], names[unique_users[k]]]
+            triangle_cases.append({"type": "Triangle", "users": triangle_users})
+
+        return suspicious_cases, big_fish_net, triangle_cases
+
+
+def flagged_users(suspicious, big_fish, triangles):
+    """Every user ID named by a transactions_analyzer report."""
+    to_ban = set()
+    for c in suspicious or []:
+        to_ban.update(c.get("users", []))
+    for g in big_fish or []:
+        for case in g.get("cases", []):
+            if "user" in case:
+                to_ban.add(case["user"])
+            else:
+                to_ban.add(case.get("u1"))
+                to_ban.add(case.get("u2"))
+    for t in triangles or []:
+        to_ban.update(t.get("users", []))
+    to_ban.discard(None)
+    return to_ban
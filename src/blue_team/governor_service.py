@@ -0,0 +1,161 @@
+import sys
+import json
+import argparse
+import redis
+
+try:
+    from src.common.config import Config
+    from src.common.redis_client import get_redis_client
+    from src.blue_team.Governor import Governor, flagged_users
+    from src.blue_team.send_to_redis import FraudReporter
+except ImportError:
+    from common.config import Config
+    from common.redis_client import get_redis_client
+    from Governor import Governor, flagged_users
+    from send_to_redis import FraudReporter
+
+
+class RedisIdMap:
+    """Interned ID -> user ID for packed entries, refreshed from the ids hash on a miss."""
+
+    def __init__(self, client, key):
+        self.client = client
+        self.key = key
+        self.names = {}
+
+    def __getitem__(self, wire_id):
+        name = self.names.get(wire_id)
+        if name is None:
+            self.names = {int(k): v for k, v in self.client.hgetall(self.key).items()}
+            name = self.names[wire_id]
+        return name
+
+
+class GovernorService:
+    """
+    Governor as a standalone consumer of the money_flow stream.
+
+    Entries are read with XREADGROUP and acknowledged only after their
+    alerts and ban requests are published, so a restarted service resumes
+    from the group's position: the window is rebuilt from entries already
+    delivered, and anything left pending (by this consumer, or by another
+    one idle for GOVERNOR_CLAIM_IDLE_MS) is analysed and acknowledged.
+
+    Bans are not applied here: flagged users go to the bans stream, which
+    the simulator drains each turn (GOVERNOR_MODE=service).
+
+    Run one service per game stream; the window is per consumer, so
+    several consumers on one stream would each see only part of the graph.
+    """
+
+    def __init__(self, redis_client=None, key_prefix="", group=None, consumer=None):
+        self.redis = redis_client or get_redis_client()
+        self.stream_key = key_prefix + Config.KEY_STREAM
+        self.bans_key = key_prefix + Config.KEY_BANS
+        self.ids_key = key_prefix + Config.KEY_USER_IDS
+        self.group = group or Config.GOVERNOR_GROUP
+        self.consumer = consumer or Config.GOVERNOR_CONSUMER
+        self.reporter = FraudReporter(self.redis, key_prefix)
+        self.processed = 0
+        self.ban_requests = 0
+        self._new_governor()
+
+    def _new_governor(self):
+        self.governor = Governor(wire_names=RedisIdMap(self.redis, self.ids_key))
+
+    def ensure_group(self):
+        try:
+            self.redis.xgroup_create(self.stream_key, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def recover(self):
+        """Rebuild the window up to the group's position and finish pending entries."""
+        groups = {g["name"]: g for g in self.redis.xinfo_groups(self.stream_key)}
+        last_delivered = groups[self.group]["last-delivered-id"]
+        if last_delivered == "0-0":
+            return 0
+
+        # Window warm-up: ingest without analysing (eviction keeps it bounded)
+        start = "-"
+        while True:
+            entries = self.redis.xrange(self.stream_key, min=start, max=last_delivered, count=Config.GOVERNOR_BATCH)
+            if not entries:
+                break
+            self.governor.ingest([fields for _, fields in entries])
+            start = "(" + entries[-1][0]
+
+        # Pending: ours from a previous run, plus entries stuck with dead consumers
+        pending = {p["message_id"] for p in self.redis.xpending_range(
+            self.stream_key, self.group, min="-", max="+", count=Config.GOVERNOR_BATCH, consumername=self.consumer)}
+        cursor = "0-0"
+        while True:
+            cursor, claimed = self.redis.xautoclaim(self.stream_key, self.group, self.consumer,
+                                                    min_idle_time=Config.GOVERNOR_CLAIM_IDLE_MS,
+                                                    start_id=cursor, count=Config.GOVERNOR_BATCH)[:2]
+            pending.update(eid for eid, _ in claimed)
+            if cursor == "0-0":
+                break
+
+        if pending:
+            self._publish(*self.governor.analyze())
+            self.redis.xack(self.stream_key, self.group, *pending)
+        print(f"♻️ [GOVERNOR] Resumed after {last_delivered}: window {len(self.governor.memory)} txs, "
+              f"{len(pending)} pending recovered")
+        return len(pending)
+
+    def step(self, block_ms=None):
+        """Read, analyse and acknowledge one batch; returns the number of entries."""
+        try:
+            res = self.redis.xreadgroup(self.group, self.consumer, {self.stream_key: ">"},
+                                        count=Config.GOVERNOR_BATCH, block=block_ms)
+        except redis.ResponseError as e:
+            if "NOGROUP" not in str(e) and self.redis.exists(self.stream_key):
+                raise
+            # Stream was reset (new game): start over with an empty window
+            self._new_governor()
+            self.ensure_group()
+            return 0
+        if not res:
+            return 0
+        _, entries = res[0]
+        ids = [eid for eid, _ in entries]
+        self._publish(*self.governor.transactions_analyzer([fields for _, fields in entries]))
+        self.redis.xack(self.stream_key, self.group, *ids)
+        self.processed += len(ids)
+        return len(ids)
+
+    def _publish(self, sus, big, tri):
+        self.reporter.publish_report(sus, big, tri)
+        users = flagged_users(sus, big, tri)
+        if users:
+            self.redis.xadd(self.bans_key, {"users": json.dumps(sorted(users))})
+            self.ban_requests += len(users)
+
+    def run(self):
+        self.ensure_group()
+        self.recover()
+        print(f"👮 [GOVERNOR] Consuming '{self.stream_key}' as {self.group}/{self.consumer}")
+        try:
+            while True:
+                self.step(block_ms=Config.GOVERNOR_BLOCK_MS)
+        except KeyboardInterrupt:
+            pass
+        print(f"👮 [GOVERNOR] Stopped: {self.processed} txs analysed, {self.ban_requests} ban requests")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Governor as a Redis consumer-group service')
+    parser.add_argument('--prefix', default='', help='Redis key prefix of the game to police (e.g. game:3:)')
+    parser.add_argument('--group', default=None, help=f'Consumer group (default: {Config.GOVERNOR_GROUP})')
+    parser.add_argument('--consumer', default=None, help='Consumer name; keep it stable across restarts')
+
+    args = parser.parse_args()
+
+    GovernorService(key_prefix=args.prefix, group=args.group, consumer=args.consumer).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
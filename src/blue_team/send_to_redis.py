@@ -1,23 +1,29 @@
 import redis
-import os
 import json
 from datetime import datetime
 from dotenv import load_dotenv
 
+try:
+    from src.common.config import Config
+    from src.common.redis_client import get_shared_client
+    from src.common.archive import append_jsonl
+except ImportError:
+    from common.config import Config
+    from common.redis_client import get_shared_client
+    from common.archive import append_jsonl
+
 load_dotenv()
 
 class FraudReporter:
-    def __init__(self, redis_client=None):
+    def __init__(self, redis_client=None, key_prefix=""):
         
-        self.alert_channel = "governor:alerts"
+        self.alert_channel = key_prefix + Config.KEY_ALERTS
         
         if redis_client:
             self.redis = redis_client
         else:
-            host = os.getenv("REDIS_HOST", "localhost")
-            port = int(os.getenv("REDIS_PORT", 6379))
             try:
-                self.redis = redis.Redis(host=host, port=port, db=0, decode_responses=True)
+                self.redis = get_shared_client()
                 self.redis.ping()
             except redis.ConnectionError:
                 print("[REPORTER] Redis connection failed.")
@@ -48,7 +54,15 @@ class FraudReporter:
             "details": data
         }
         try:
-            self.redis.lpush(self.alert_channel, json.dumps(payload))
+            # Capped alert log: newest ALERTS_MAX kept, the overflow optionally archived
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.lpush(self.alert_channel, json.dumps(payload))
+            if Config.ALERTS_ARCHIVE:
+                pipe.lrange(self.alert_channel, Config.ALERTS_MAX, -1)
+            pipe.ltrim(self.alert_channel, 0, Config.ALERTS_MAX - 1)
+            results = pipe.execute()
+            if Config.ALERTS_ARCHIVE and results[1]:
+                append_jsonl(Config.ALERTS_ARCHIVE, [json.loads(a) for a in reversed(results[1])])
             print(f"📡 [REPORTER] Sent {len(data)} {alert_type} alerts to Redis.")
         except Exception as e:
             print(f"[REPORTER] Failed to push to Redis: {e}")
\ No newline at end of file
@@ -0,0 +1,41 @@
+from collections import defaultdict
+
+
+def find_directed_triangles(edges):
+    """
+    Enumerate directed 3-cycles (a -> b -> c -> a) in a sparse graph.
+
+    Edges are oriented from lower to higher (degree, node) rank and each
+    node only intersects its forward neighbour sets, so every undirected
+    triangle is visited once and the cost stays near O(E^1.5) instead of
+    the O(N^3) of a dense matrix cube.
+
+    Args:
+        edges: Iterable of directed (sender, receiver) node pairs
+
+    Returns:
+        List of (a, b, c) tuples, one per node set, with a the smallest node
+    """
+    directed = set()
+    neighbours = defaultdict(set)
+    for u, v in edges:
+        if u == v:
+            continue
+        directed.add((u, v))
+        neighbours[u].add(v)
+        neighbours[v].add(u)
+
+    rank = {u: (len(nbrs), u) for u, nbrs in neighbours.items()}
+    forward = {u: {v for v in nbrs if rank[v] > rank[u]} for u, nbrs in neighbours.items()}
+
+    triangles = []
+    for u, u_fwd in forward.items():
+        for v in u_fwd:
+            for w in u_fwd & forward[v]:
+                a, b, c = sorted((u, v, w))
+                # Same tie-break as walking successors of a in ascending order
+                if (a, b) in directed and (b, c) in directed and (c, a) in directed:
+                    triangles.append((a, b, c))
+                elif (a, c) in directed and (c, b) in directed and (b, a) in directed:
+                    triangles.append((a, c, b))
+    return triangles
@@ -0,0 +1,81 @@
+import numpy as np
+
+
+class TransactionWindow:
+    """
+    Columnar buffer holding the Governor's sliding window.
+
+    Each column is a NumPy array (epoch ms as int64, amount as float64,
+    sender/receiver as interned int32 IDs). Live rows sit between `head`
+    and `tail`; eviction just advances `head`, and the buffer is compacted
+    or grown only when an append runs out of room at the end.
+    """
+
+    def __init__(self, capacity=4096):
+        self.head = 0
+        self.tail = 0
+        self.epochs = np.empty(capacity, dtype=np.int64)
+        self.amounts = np.empty(capacity, dtype=np.float64)
+        self.senders = np.empty(capacity, dtype=np.int32)
+        self.receivers = np.empty(capacity, dtype=np.int32)
+
+    def __len__(self):
+        return self.tail - self.head
+
+    @property
+    def latest_epoch(self):
+        return int(self.epochs[self.tail - 1])
+
+    def _reserve(self, n):
+        if self.tail + n <= len(self.epochs):
+            return
+        live = len(self)
+        capacity = len(self.epochs)
+        while live + n > capacity:
+            capacity *= 2
+        for name in ("epochs", "amounts", "senders", "receivers"):
+            old = getattr(self, name)
+            new = old if capacity == len(old) else np.empty(capacity, dtype=old.dtype)
+            new[:live] = old[self.head:self.tail]
+            setattr(self, name, new)
+        self.head, self.tail = 0, live
+
+    def append(self, epochs, amounts, senders, receivers):
+        """
+        Add rows at the end.
+
+        Returns:
+            buffer position of the first new row (taken after any compaction,
+            so rows(start, tail) is exactly the appended rows)
+        """
+        n = len(epochs)
+        assert len(amounts) == len(senders) == len(receivers) == n, "columns must have equal length"
+        self._reserve(n)
+        start = self.tail
+        end = self.tail + n
+        self.epochs[self.tail:end] = epochs
+        self.amounts[self.tail:end] = amounts
+        self.senders[self.tail:end] = senders
+        self.receivers[self.tail:end] = receivers
+        self.tail = end
+        return start
+
+    def rows(self, start, stop):
+        """(sender, receiver, amount) tuples for buffer positions [start, stop)."""
+        return zip(self.senders[start:stop].tolist(),
+                   self.receivers[start:stop].tolist(),
+                   self.amounts[start:stop].tolist())
+
+    def evict_older_than(self, cutoff_ms):
+        """
+        Drop leading rows with epoch < cutoff_ms, stopping at the first live
+        row just like popleft() on a deque would.
+
+        Returns:
+            (start, stop) buffer positions of the evicted rows
+        """
+        start = self.head
+        live = self.epochs[self.head:self.tail]
+        keep = np.flatnonzero(live >= cutoff_ms)
+        self.head += int(keep[0]) if keep.size else len(live)
+        return start, self.head
@@ -0,0 +1,137 @@
+from collections import Counter, defaultdict, deque
+
+import numpy as np
+
+
+class EdgeStats:
+    """Running totals for one directed (sender, receiver) edge of the window."""
+
+    __slots__ = ("count", "over_100", "volume_over_100", "over_300", "over_2000", "amounts", "_max_amounts")
+
+    def __init__(self):
+        self.count = 0
+        self.over_100 = 0
+        self.volume_over_100 = 0.0
+        self.over_300 = 0
+        self.over_2000 = 0
+        self.amounts = deque()  # Live tx amounts, oldest first
+        # Monotonic queue: the window is FIFO, so the largest live amount is
+        # always at the front and eviction only ever touches the front.
+        self._max_amounts = deque()
+
+    @property
+    def max_amount(self):
+        return self._max_amounts[0] if self._max_amounts else 0.0
+
+    def add(self, amount):
+        self.count += 1
+        if amount > 100:
+            self.over_100 += 1
+            self.volume_over_100 += amount
+        if amount > 300:
+            self.over_300 += 1
+        if amount > 2000:
+            self.over_2000 += 1
+        self.amounts.append(amount)
+        while self._max_amounts and self._max_amounts[-1] < amount:
+            self._max_amounts.pop()
+        self._max_amounts.append(amount)
+
+    def remove(self, amount):
+        self.count -= 1
+        if amount > 100:
+            self.over_100 -= 1
+            self.volume_over_100 -= amount
+        if amount > 300:
+            self.over_300 -= 1
+        if amount > 2000:
+            self.over_2000 -= 1
+        self.amounts.popleft()
+        if self._max_amounts and self._max_amounts[0] == amount:
+            self._max_amounts.popleft()
+
+
+class WindowGraph:
+    """
+    Transaction graph of the Governor's sliding window.
+
+    Updated on every append and eviction so the analyzer never has to
+    re-aggregate the whole window: per-user volumes, unordered pair
+    frequencies and per-directed-edge stats are always current.
+    """
+
+    def __init__(self):
+        self.user_volumes = Counter()
+        self.user_tx_count = Counter()  # Users with at least one live tx
+        self.pair_counts = Counter()    # Unordered (a, b) -> tx count
+        self.edges = {}                 # (sender, receiver) -> EdgeStats
+        # Smurfing index: sender -> {receiver -> EdgeStats} sharing the
+        # objects in self.edges, plus per-sender totals of txs over $100
+        self.out_edges = defaultdict(dict)
+        self.outgoing_count = Counter()
+        self.outgoing_volume = Counter()
+
+    def __len__(self):
+        return len(self.user_tx_count)
+
+    @staticmethod
+    def pair_key(a, b):
+        return (a, b) if a <= b else (b, a)
+
+    def add(self, sender, receiver, amount):
+        self.user_volumes[sender] += amount
+        self.user_volumes[receiver] += amount
+        self.user_tx_count[sender] += 1
+        self.user_tx_count[receiver] += 1
+        self.pair_counts[self.pair_key(sender, receiver)] += 1
+
+        edge = self.edges.get((sender, receiver))
+        if edge is None:
+            edge = self.edges[(sender, receiver)] = EdgeStats()
+            self.out_edges[sender][receiver] = edge
+        edge.add(amount)
+
+        if amount > 100:
+            self.outgoing_count[sender] += 1
+            self.outgoing_volume[sender] += amount
+
+    def remove(self, sender, receiver, amount):
+        for u in (sender, receiver):
+            self.user_tx_count[u] -= 1
+            if self.user_tx_count[u] <= 0:
+                # Drop the key entirely so float residue never lingers
+                del self.user_tx_count[u]
+                del self.user_volumes[u]
+            else:
+                self.user_volumes[u] -= amount
+
+        key = self.pair_key(sender, receiver)
+        self.pair_counts[key] -= 1
+        if self.pair_counts[key] <= 0:
+            del self.pair_counts[key]
+
+        edge = self.edges[(sender, receiver)]
+        edge.remove(amount)
+        if edge.count <= 0:
+            del self.edges[(sender, receiver)]
+            del self.out_edges[sender][receiver]
+            if not self.out_edges[sender]:
+                del self.out_edges[sender]
+
+        if amount > 100:
+            self.outgoing_count[sender] -= 1
+            if self.outgoing_count[sender] <= 0:
+                del self.outgoing_count[sender]
+                del self.outgoing_volume[sender]
+            else:
+                self.outgoing_volume[sender] -= amount
+
+    def amounts_between(self, users):
+        """All live tx amounts whose sender and receiver are both in `users`."""
+        members = users if isinstance(users, (set, frozenset)) else set(users)
+        chunks = []
+        for sender in members:
+            for receiver, edge in self.out_edges.get(sender, {}).items():
+                if receiver in members:
+                    chunks.extend(edge.amounts)
+        return np.fromiter(chunks, dtype=np.float64, count=len(chunks))
@@ -0,0 +1,11 @@
+import json
+
+
+def append_jsonl(path, records):
+    """Append records (dicts) to a local JSON-lines archive; returns how many were written."""
+    if not path or not records:
+        return 0
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    return len(records)
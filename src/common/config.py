@@ -6,6 +6,16 @@ load_dotenv()
 class Config:
    REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
    REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+   REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 16)) # ORIO SUNDESEWN STO KOINO POOL ANA PROCESS
+   REDIS_POOL_TIMEOUT = 5.0           # POSO PERIMENOUME ELEFTHERH SUNDESH OTAN TO POOL EINAI GEMATO
+   REDIS_SOCKET_TIMEOUT = 5.0         # AN KANEI PANW APO TOSA DEUTEROLEPTA KANE DISC
+   REDIS_HEALTH_CHECK_INTERVAL = 30   # PING SE IDLE SUNDESEIS PRIN KSANAXRHSIMOPOIHTHOUN
+   GOVERNOR_MODE = os.getenv("GOVERNOR_MODE", "inprocess") # "inprocess" H "service" (governor_service.py)
+   GOVERNOR_GROUP = "governor"        # CONSUMER GROUP STO money_flow
+   GOVERNOR_CONSUMER = os.getenv("GOVERNOR_CONSUMER", "governor-1") # IDIO ONOMA META APO RESTART
+   GOVERNOR_BATCH = 5000              # MEGISTA ENTRIES ANA XREADGROUP
+   GOVERNOR_BLOCK_MS = 1000           # POSO PERIMENEI NEA ENTRIES
+   GOVERNOR_CLAIM_IDLE_MS = 30000     # PENDING APO ALLON CONSUMER PANW APO TOSO IDLE = NEKROS, TA PAIRNOUME
    GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
    TICK_DURATION = 2.0
    TOTAL_TICKS = 200 
@@ -14,3 +24,33 @@ class Config:
    KEY_BANNED = "sim:banned"    # SET WITH BANNS    
    KEY_GAME_STATE = "sim:state" # TICK , SCORE , STATUS 
    KEY_IDENTITY = "sim:identity" # H PLHROFORIA POIOS EINAI TI PX AC_1 : FRAUDSTER
+   KEY_USER_IDS = "sim:ids"     # INTERNED INT -> USER ID GIA TO PACKED STREAM
+   KEY_STREAM = "money_flow"    # TO STREAM ME TIS SUNALAGES
+   KEY_ALERTS = "governor:alerts" # LIST ME TA ALERTS TOU GOVERNOR
+   KEY_BANS = "governor:bans"   # STREAM ME BAN REQUESTS APO TO GOVERNOR SERVICE PROS TON SIMULATOR
+   # Ola ta parapanw keys mporoun na paroun prefix (px "game:3:") gia polla paixnidia sto idio Redis
+   STREAM_FORMAT = os.getenv("STREAM_FORMAT", "fields") # "fields" H "packed" (ENA BINARY FIELD ANA TX)
+   STREAM_FLUSH_SIZE = 500       # FLUSH TO BUFFER TWN TX OTAN FTASEI TOSA
+   STREAM_FLUSH_INTERVAL = 1.0   # H OTAN PERASOUN TOSA DEUTEROLEPTA APO TO PRWTO TX
+   STREAM_RETENTION = os.getenv("STREAM_RETENTION", "window") # "window" (MINID ~ GIA TO PARATHYRO TOU GOVERNOR), "maxlen" H "off"
+   STREAM_RETENTION_WINDOWS = 1.5 # POSA PARATHYRA GOVERNOR KRATAME STO STREAM (window mode)
+   STREAM_MAXLEN = 50000          # MEGETHOS STREAM (maxlen mode, approximate)
+   STREAM_ARCHIVE = os.getenv("STREAM_ARCHIVE", "") # JSONL ARXEIO GIA OTI KOBETAI APO TO STREAM (window mode)
+   ALERTS_MAX = 1000              # MEGISTA ALERTS STO governor:alerts (LTRIM)
+   ALERTS_ARCHIVE = os.getenv("ALERTS_ARCHIVE", "") # JSONL ARXEIO GIA TA ALERTS POU KOBONTAI
+   FAST_FORWARD = os.getenv("FAST_FORWARD", "0") == "1" # XWRIS SLEEP ANAMESA STA TICKS (SIM TIME MONO)
+   LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini") # "gemini" H "fake" (OFFLINE, XWRIS KLEIDIA)
+   LLM_HEDGE = int(os.getenv("LLM_HEDGE", "1"))     # POSA (KEY, MODEL) TAUTOXRONA ANA APOFASI
+   LLM_COOLDOWN = 30.0       # DEUTEROLEPTA PAUSH GIA (KEY, MODEL) META APO 429/500
+   LLM_COOLDOWN_MAX = 300.0  # MEGISTH PAUSH (DIPLASIAZETAI SE KATHE SYNEXOMENO THROTTLE)
+   LLM_CACHE = os.getenv("LLM_CACHE", "0") == "1"          # CACHE APOFASEWN GIA IDIES KATASTASEIS
+   LLM_CACHE_POLICY = os.getenv("LLM_CACHE_POLICY", "safe") # "safe" (OXI smurf/cash_out) H "always"
+   LLM_CACHE_TTL = 10          # GYROI POU ISXYEI MIA APOFASI
+   LLM_CACHE_SIZE = 256        # MEGISTES EGGRAFES (LRU)
+   LLM_CACHE_BUCKET = 5000.0   # KVANTISMOS YPOLOIPWN DIRTY/CLEAN SE $
+   LLM_CACHE_MAX_REUSE = 3     # POSES FORES XANA PRIN RWTHSOUME TO MODELO
+   VIZ_LAYOUT = os.getenv("VIZ_LAYOUT", "auto") # "spring", "grid" (PROSEGGISH GIA MEGALA GRAPHS) H "auto"
+   VIZ_LAYOUT_REFINE = 5         # ITERATIONS ANA SNAPSHOT XEKINWNTAS APO TIS PROHGOUMENES THESEIS
+   VIZ_LAYOUT_GRID_NODES = 2000  # PANW APO TOSOUS KOMBOUS TO "auto" PAEI SE "grid"
+   VIZ_ASYNC = os.getenv("VIZ_ASYNC", "1") == "1" # SNAPSHOTS SE BACKGROUND THREAD (O GYROS DEN PERIMENEI)
+   VIZ_ANIMATE = os.getenv("VIZ_ANIMATE", "0") == "1" # ENA ANIMATED HTML ANTI GIA ENA ARXEIO ANA SNAPSHOT
@@ -4,25 +4,50 @@ import logging
 
 #Όλες οι ρυθμίσεις μας όπως ΧΟΣΤ ΠΟΡΤ απο το CONFIG.PY αυτό το αρχέιο δεν πρέπει να αλλάξει 
 
-from src.common.config import Config
+try:
+    from src.common.config import Config
+except ImportError:
+    from common.config import Config
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def get_redis_client():
-    try:
-
+_pool = None
+_verified = False
 
-        #edw pame na sundethoume decode_repsonses=True epitrepei to reddis na gurnaei str oxi bytes
-        client = redis.Redis(
+def get_connection_pool():
+    # Ena pool ana process gia simulator, reporter kai visualizer.
+    # redis-py ksanaftiaxnei tis sundeseis meta apo fork (multi_game workers)
+    global _pool
+    if _pool is None:
+        #decode_repsonses=True epitrepei to reddis na gurnaei str oxi bytes
+        _pool = redis.BlockingConnectionPool(
                 host=Config.REDIS_HOST,
                 port=Config.REDIS_PORT,
+                db=0,
                 decode_responses=True,
-                socket_timeout=5 # An kanei panw apo 5 deuterolepta kane disc
+                max_connections=Config.REDIS_MAX_CONNECTIONS,
+                timeout=Config.REDIS_POOL_TIMEOUT,
+                socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=Config.REDIS_SOCKET_TIMEOUT,
+                socket_keepalive=True,
+                health_check_interval=Config.REDIS_HEALTH_CHECK_INTERVAL,
                 )
+    return _pool
 
-        client.ping()
-        logger.info(f"Connected to Redis at {Config.REDIS_HOST}:{Config.REDIS_PORT}")
+def get_shared_client():
+    """Client on the shared pool, no ping: callers handle redis.ConnectionError."""
+    return redis.Redis(connection_pool=get_connection_pool())
+
+def get_redis_client():
+    global _verified
+    try:
+        client = get_shared_client()
+        if not _verified:
+            # Ping mono thn prwth fora, meta to pool kanei health checks
+            client.ping()
+            _verified = True
+            logger.info(f"Connected to Redis at {Config.REDIS_HOST}:{Config.REDIS_PORT}")
         return client
     except redis.ConnectionError:
         logger.error("I COULD'T CONNECT TO REDIS.")
@@ -33,9 +58,10 @@ def get_redis_client():
 
         sys.exit(1)
 
-def reset_simulation_data(client):
+def reset_simulation_data(client, key_prefix=""):
 
     logger.warning("Cleaning old run data")
-    keys_to_delete = [ Config.KEY_TRANSACTIONS, Config.KEY_BALANCES, Config.KEY_BANNED, Config.KEY_GAME_STATE, "sim:identity" ]
-    client.delete(*keys_to_delete)
+    keys_to_delete = [ Config.KEY_TRANSACTIONS, Config.KEY_BALANCES, Config.KEY_BANNED, Config.KEY_GAME_STATE, "sim:identity", Config.KEY_USER_IDS,
+                       Config.KEY_STREAM, Config.KEY_ALERTS, Config.KEY_BANS ]
+    client.delete(*[key_prefix + key for key in keys_to_delete])
     logger.info("Cleaned ready to run again")
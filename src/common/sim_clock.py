@@ -0,0 +1,35 @@
+import time
+from datetime import datetime
+
+try:
+    from src.common.config import Config
+except ImportError:
+    from common.config import Config
+
+
+class SimClock:
+    """
+    Simulation time, owned by FraudEnvironment.
+
+    Advances exactly one TICK_DURATION per turn regardless of how long the
+    turn took on the wall clock, so transaction stamps (and therefore the
+    Governor's eviction window) mean the same thing in real-time and
+    fast-forward runs.
+    """
+
+    def __init__(self, tick_duration=None, start_ms=None):
+        self.tick_ms = int((Config.TICK_DURATION if tick_duration is None else tick_duration) * 1000)
+        # Whole seconds, so the "fields" format (1s resolution) round-trips exactly
+        self.start_ms = int(time.time()) * 1000 if start_ms is None else start_ms
+        self.tick = 0
+        self._update()
+
+    def _update(self):
+        self.now_ms = self.start_ms + self.tick * self.tick_ms
+        # Cached per tick: every tx in the tick shares the same stamp
+        self.timestamp = datetime.fromtimestamp(self.now_ms / 1000).strftime("%Y-%m-%d %H:%M:%S")
+
+    def advance(self, ticks=1):
+        self.tick += ticks
+        self._update()
+        return self.tick
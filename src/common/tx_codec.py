@@ -0,0 +1,45 @@
+import base64
+import struct
+
+# Compact wire format for money_flow entries.
+# One field holds epoch ms, amount in cents, interned sender/receiver IDs and
+# a FRAUD/CIVIL flag, base64-encoded so it survives decode_responses=True.
+
+PACKED_FIELD = "p"
+_RECORD = struct.Struct("<qqiiB")  # epoch_ms, cents, sender, receiver, flag
+FLAG_FRAUD = 1
+
+
+def encode_tx(epoch_ms, amount, sender, receiver, tx_type):
+    cents = int(round(amount * 100))
+    flag = FLAG_FRAUD if tx_type == "FRAUD" else 0
+    return base64.b64encode(_RECORD.pack(epoch_ms, cents, sender, receiver, flag)).decode("ascii")
+
+
+def decode_tx(payload):
+    """Returns (epoch_ms, amount, sender, receiver, tx_type) with interned IDs."""
+    raw = base64.b64decode(payload, validate=True)
+    if len(raw) != _RECORD.size:
+        raise ValueError(f"Packed tx record must be {_RECORD.size} bytes, got {len(raw)}")
+    epoch_ms, cents, sender, receiver, flag = _RECORD.unpack(raw)
+    return epoch_ms, cents / 100.0, sender, receiver, "FRAUD" if flag & FLAG_FRAUD else "CIVIL"
+
+
+class UserIdTable:
+    """Interns external user IDs to dense ints for the packed stream format."""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        """Returns (id, is_new)."""
+        uid = self.ids.get(name)
+        if uid is not None:
+            return uid, False
+        uid = self.ids[name] = len(self.names)
+        self.names.append(name)
+        return uid, True
@@ -0,0 +1,147 @@
+import numpy as np
+
+
+class AccountStore:
+    """
+    Compact, array-backed alternative to the FraudEnvironment.users dict.
+
+    Accounts are dense integer IDs into NumPy columns (type/state as int8,
+    group as int16, balance as float64). `store[uid]['balance']` still works
+    through a small row view, so simulator code is the same for both stores.
+    The UUID-like external ID is derived from the dense ID on demand and is
+    only needed at the Redis/reporting edge.
+    """
+
+    TYPES = ("student", "worker", "entrepreneur", "bot", "fraud_dirty", "fraud_clean")
+    STATES = ("active", "banned")
+    TYPE_CODES = {t: i for i, t in enumerate(TYPES)}
+    STATE_CODES = {s: i for i, s in enumerate(STATES)}
+
+    # External IDs: the 48-bit dense ID is salted, scrambled with an odd
+    # multiplier (invertible mod 2^48) and tagged with the salt
+    _MASK = (1 << 48) - 1
+    _MUL = 0x9E3779B97F4B
+    _INV = pow(_MUL, -1, 1 << 48)
+
+    def __init__(self, capacity=1024, salt=0):
+        self.size = 0
+        self.salt = salt & 0xFFFF
+        self._salt_bits = self.salt * 0x000100010001
+        self.types = np.empty(capacity, dtype=np.int8)
+        self.states = np.empty(capacity, dtype=np.int8)
+        self.groups = np.empty(capacity, dtype=np.int16)
+        self.balances = np.empty(capacity, dtype=np.float64)
+
+    def _reserve(self, n):
+        if self.size + n <= len(self.types):
+            return
+        capacity = max(len(self.types) * 2, self.size + n)
+        for name in ("types", "states", "groups", "balances"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add_many(self, type_codes, balances, groups):
+        """Append accounts column-wise; returns the range of new dense IDs."""
+        n = len(type_codes)
+        self._reserve(n)
+        start, end = self.size, self.size + n
+        self.types[start:end] = type_codes
+        self.states[start:end] = self.STATE_CODES["active"]
+        self.groups[start:end] = groups
+        self.balances[start:end] = balances
+        self.size = end
+        return range(start, end)
+
+    def add(self, acct_type, balance, group_id):
+        return self.add_many([self.TYPE_CODES[acct_type]], [balance], [group_id])[0]
+
+    def external_id(self, uid):
+        x = ((uid ^ self._salt_bits) * self._MUL) & self._MASK
+        h = f"{x:012x}"
+        return f"{h[:4]}-{h[4:8]}-{h[8:]}-{self.salt:04x}"
+
+    def external_ids(self, uids):
+        """external_id for an array of dense IDs, scrambled in one vectorised pass."""
+        x = ((np.asarray(uids, dtype=np.uint64) ^ np.uint64(self._salt_bits)) * np.uint64(self._MUL)) & np.uint64(self._MASK)
+        tag = f"{self.salt:04x}"
+        return [f"{h[:4]}-{h[4:8]}-{h[8:]}-{tag}" for h in (f"{v:012x}" for v in x.tolist())]
+
+    def internal_id(self, external):
+        """Dense ID for an external ID from this store, or None."""
+        parts = external.split("-") if isinstance(external, str) else ()
+        if len(parts) != 4 or parts[3] != f"{self.salt:04x}":
+            return None
+        try:
+            x = int("".join(parts[:3]), 16)
+        except ValueError:
+            return None
+        uid = ((x * self._INV) & self._MASK) ^ self._salt_bits
+        return uid if uid < self.size else None
+
+    # --- dict-like interface over dense IDs ---
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, uid):
+        return isinstance(uid, (int, np.integer)) and 0 <= uid < self.size
+
+    def __iter__(self):
+        return iter(range(self.size))
+
+    def __getitem__(self, uid):
+        if uid not in self:
+            raise KeyError(uid)
+        return _AccountRow(self, int(uid))
+
+    def keys(self):
+        return range(self.size)
+
+    def values(self):
+        return (_AccountRow(self, i) for i in range(self.size))
+
+    def items(self):
+        return ((i, _AccountRow(self, i)) for i in range(self.size))
+
+
+class _AccountRow:
+    """Dict-style view of one account row in an AccountStore."""
+
+    __slots__ = ("store", "uid")
+
+    def __init__(self, store, uid):
+        self.store = store
+        self.uid = uid
+
+    def __getitem__(self, key):
+        s, i = self.store, self.uid
+        if key == "balance":
+            return float(s.balances[i])
+        if key == "type":
+            return s.TYPES[s.types[i]]
+        if key == "state":
+            return s.STATES[s.states[i]]
+        if key == "group_id":
+            return int(s.groups[i])
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        s, i = self.store, self.uid
+        if key == "balance":
+            s.balances[i] = value
+        elif key == "state":
+            s.states[i] = s.STATE_CODES[value]
+        elif key == "type":
+            s.types[i] = s.TYPE_CODES[value]
+        elif key == "group_id":
+            s.groups[i] = value
+        else:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
@@ -1,12 +1,9 @@
 import os
-import json
 import time
 import logging
-from google import genai
-from google.genai import types
 from dotenv import load_dotenv
 try:
-    from graph_visualizer import TransactionGraphVisualizer
+    from graph_visualizer import SnapshotRenderer
     VISUALIZER_AVAILABLE = True
 except ImportError:
     VISUALIZER_AVAILABLE = False
@@ -27,6 +24,12 @@ try:
     from fraud_sim import sim
 except ImportError:
     from src.red_team.fraud_sim import sim
+try:
+    from llm_backend import DecisionBackend, FakeClient
+    from decision_cache import DecisionCache
+except ImportError:
+    from src.red_team.llm_backend import DecisionBackend, FakeClient
+    from src.red_team.decision_cache import DecisionCache
 
 load_dotenv()
 
@@ -34,6 +37,8 @@ load_dotenv()
 api_keys = [val for key, val in os.environ.items() if key.startswith("GEMINI_KEY_")]
 if not api_keys:
     api_keys = [os.getenv("GEMINI_API_KEY")] if os.getenv("GEMINI_API_KEY") else []
+if not api_keys and Config.LLM_BACKEND == "fake":
+    api_keys = ["fake"]
 if not api_keys: raise ValueError("No API keys found!")
 print(f"Loaded {len(api_keys)} API Keys.")
 
@@ -237,24 +242,16 @@ NOTE: If you decide to SKIP this round, use fake_commerce with empty parameters:
 }
 """
 
+# One long-lived client per key; LLM_HEDGE > 1 races the top (key, model) pairs
+backend = DecisionBackend(api_keys, MODEL_POOL, SYSTEM_INSTRUCTION, hedge=Config.LLM_HEDGE,
+                          client_factory=FakeClient if Config.LLM_BACKEND == "fake" else None)
+
+# Optional reuse of decisions for repeated (quantised) game states
+decision_cache = DecisionCache() if Config.LLM_CACHE else None
+
 def get_decision_exhaustive(prompt):
-    safety = [types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_NONE")]
-    
-    for i, key in enumerate(api_keys):
-        client = genai.Client(api_key=key)
-        for model in MODEL_POOL:
-            try:
-                res = client.models.generate_content(
-                    model=model, contents=prompt,
-                    config=types.GenerateContentConfig(response_mime_type="application/json", system_instruction=SYSTEM_INSTRUCTION, safety_settings=safety)
-                )
-                return res, model, i+1
-            except Exception as e:
-                err = str(e)
-                if "429" in err or "500" in err: 
-                    break 
-                continue
-    return None, None, None
+    """Returns (decision dict, model, key number) or (None, None, None)."""
+    return backend.decide(prompt)
 
 def print_final_report(start_equity):
     print("\n" + "="*40)
@@ -270,30 +267,27 @@ def print_final_report(start_equity):
     print(f"⚫ REMAINING / BURNED:   ${rem:,.0f}")
     
     # Additional stats
-    banned_bots = sum(1 for u, d in sim.users.items() 
-                      if d['type'] == 'bot' and d['state'] == 'banned')
+    banned_bots = sim.banned_bots
     print(f"🤖 BOTS ELIMINATED:      {banned_bots}/{sim.total_bots}")
     print(f"⚠️ FALSE POSITIVES:      {sim.false_positives}")
     
     # Strategic metrics
     dirty_remaining = sim.users[sim.dirty_id]['balance']
-    bots_with_funds = sum(1 for u, d in sim.users.items() 
-                         if d['type'] == 'bot' and d['state'] == 'active' and d['balance'] > 0)
+    bots_with_funds = len(sim.funded_bots[0])
     print(f"💼 DIRTY ACCOUNT LEFT:   ${dirty_remaining:,.0f}")
     print(f"🤖 BOTS WITH FUNDS:      {bots_with_funds}")
+    llm = backend.latency_summary()
+    print(f"🧠 LLM ATTEMPTS:         {llm['ok']}/{llm['attempts']} ok, avg {llm['mean_latency']:.2f}s, {llm['cooling']} cooling down")
+    if decision_cache:
+        c = decision_cache.stats()
+        print(f"🗃️ DECISION CACHE:       {c['hits']} hits / {c['misses']} misses ({c['hit_rate']*100:.0f}%), {c['evictions']} evicted")
     print("="*40)
 
 def play_game():
     print("🧹 Resetting Redis...") 
-    reset_simulation_data(get_redis_client()) 
-
-    # CRITICAL: Clear transaction stream to avoid reading old game data
-    redis_client = get_redis_client()
-    try:
-      redis_client.delete('money_flow')
-      print("   ✓ Cleared transaction stream")
-    except Exception as e:
-      print(f"   ⚠️  Could not clear stream: {e}")
+    # CRITICAL: also clears the transaction stream to avoid reading old game data
+    reset_simulation_data(get_redis_client())
+    print("   ✓ Cleared transaction stream")
 
     print("✨ STARTING STRATEGIC SIMULATION!")
     print("📊 ENHANCED WIN CONDITIONS:")
@@ -320,6 +314,7 @@ def play_game():
     last_ban_turn = 0
 
     for turn in range(1, MAX_TURNS + 1):
+        sim.clock.advance()
         # ========== GOVERNOR PRIORITY: Check FIRST ===========
         sim.generate_background_noise()
         sim.check_for_bans()
@@ -330,10 +325,10 @@ def play_game():
         # =====================================================
         
         # AI Decision Data
-        bots = [d for d in sim.users.values() if d["type"] == "bot" and d["state"] == "active"]
-        banned = sum(1 for d in sim.users.values() if d["type"] == "bot" and d["state"] == "banned")
-        max_bal = max((b["balance"] for b in bots), default=0.0)
-        bots_with_cash = sum(1 for b in bots if b["balance"] > 50)
+        bots = sim.active_bots
+        banned = sim.banned_bots
+        max_bal = max((sim.users[b]["balance"] for b in sim.funded_bots[0]), default=0.0)
+        bots_with_cash = len(sim.funded_bots[50])
         dirty_balance = sim.users[sim.dirty_id]['balance']
         
         # Check if new bans happened
@@ -347,13 +342,17 @@ def play_game():
         bots_need_cleaning = len(bots_need_layering)
 
         total_cleanable = sum(sim.bot_received_mix.values())
+        clean_balance = sim.users[sim.clean_id]['balance']
+
+        phase = "EMERGENCY" if turns_since_ban < 3 and banned > 0 else "PLACEMENT" if dirty_balance > 30000 else "LAYERING" if bots_need_cleaning > 0 else "INTEGRATION" if bots_with_cash > 0 else "RECONNAISSANCE"
+        recommended = "fake_commerce + SKIP (cool down)" if turns_since_ban < 3 and banned > 0 else "smurf_split (3-4 bots, large amounts)" if dirty_balance > 50000 and turn % 4 == 0 else "mix_chain (clean smurfed funds)" if bots_need_cleaning > 0 else "cash_out (1-2 bots)" if max_bal > 700 else "fake_commerce (build noise)"
         
         prompt = f"""
 TURN {turn}/{MAX_TURNS} - STRATEGIC STATUS:
 
 💰 ACCOUNTS:
 - Dirty Account: ${dirty_balance:,.0f} (GOAL: Empty this to bots)
-- Clean Account: ${sim.users[sim.clean_id]['balance']:,.0f} (GOAL: Reach $75k)
+- Clean Account: ${clean_balance:,.0f} (GOAL: Reach $75k)
 - Frozen Assets: ${sim.frozen_assets:,.0f}
 
 🧼 LAYERING PROGRESS:
@@ -375,8 +374,8 @@ TURN {turn}/{MAX_TURNS} - STRATEGIC STATUS:
 - Detection Risk: {"CRITICAL - Emergency Mode!" if turns_since_ban < 3 and banned > 0 else "HIGH - Be Cautious" if turns_since_ban < 5 else "MEDIUM - Proceed Carefully" if dirty_balance > 100000 else "LOW - Operational"}
 
 📊 PHASE GUIDANCE:
-- Current Phase: {"EMERGENCY" if turns_since_ban < 3 and banned > 0 else "PLACEMENT" if dirty_balance > 30000 else "LAYERING" if bots_need_cleaning > 0 else "INTEGRATION" if bots_with_cash > 0 else "RECONNAISSANCE"}
-- Recommended Action: {"fake_commerce + SKIP (cool down)" if turns_since_ban < 3 and banned > 0 else "smurf_split (3-4 bots, large amounts)" if dirty_balance > 50000 and turn % 4 == 0 else "mix_chain (clean smurfed funds)" if bots_need_cleaning > 0 else "cash_out (1-2 bots)" if max_bal > 700 else "fake_commerce (build noise)"}
+- Current Phase: {phase}
+- Recommended Action: {recommended}
 
 🎯 STRATEGIC REMINDERS:
 1. Smurf in BATCHES: 3-4 bots max, large amounts ($10k-$15k each)
@@ -388,13 +387,16 @@ TURN {turn}/{MAX_TURNS} - STRATEGIC STATUS:
 DECIDE YOUR NEXT MOVE:
 """
         
-        res, model, kid = get_decision_exhaustive(prompt)
-        decision = None
-        if res:
-            try:
-                decision = json.loads(res.text.replace("```json","").replace("```",""))
+        cache_key = decision_cache.key(phase, recommended, dirty_balance, clean_balance, banned, turns_since_ban) if decision_cache else None
+        decision = decision_cache.get(cache_key, turn) if decision_cache else None
+        if decision:
+            last_model = "cache"
+        else:
+            decision, model, kid = get_decision_exhaustive(prompt)
+            if decision:
                 last_model = f"{model} (K{kid})"
-            except: pass
+                if decision_cache:
+                    decision_cache.put(cache_key, decision, turn)
 
         # Execute
         res_msg = "Idle"
@@ -403,8 +405,7 @@ DECIDE YOUR NEXT MOVE:
             
             # Track smurfed bots for layering requirement (BEFORE execution)
             if tool == "smurf_split":
-                smurfed_bots = [u for u, d in sim.users.items() 
-                               if d['type'] == 'bot' and d['state'] == 'active' and d['balance'] > 0]
+                smurfed_bots = list(sim.funded_bots[0])
                 bots_need_layering.update(smurfed_bots)
             
             # EXECUTE THE ACTION FIRST
@@ -418,11 +419,13 @@ DECIDE YOUR NEXT MOVE:
                         bots_need_layering.discard(bot_id)
             
             elif tool == "cash_out":
-                cashed_bots = [u for u, d in sim.users.items() 
-                              if d['type'] == 'bot' and d['state'] == 'active' and d['balance'] < 100]
+                cashed_bots = [u for u in sim.active_bots if sim.users[u]['balance'] < 100]
                 for bot in cashed_bots:
                     bots_need_layering.discard(bot)
 
+        # One pipelined XADD batch per tick for everything logged this turn
+        sim.flush_transactions()
+
         # Output
         if turn % PRINT_EVERY_N_TURNS == 0:
             print(f"\n──────────────── [ ROUND {turn:03} ] ────────────────")
@@ -454,12 +457,12 @@ DECIDE YOUR NEXT MOVE:
         frz_bots = sim.frozen_from_bots
         left = START_EQ - cln - frz
         
-        banned_bots = sum(1 for u, d in sim.users.items() 
-                         if d['type'] == 'bot' and d['state'] == 'banned')
+        banned_bots = sim.banned_bots
         bot_elimination_rate = banned_bots / sim.total_bots if sim.total_bots > 0 else 0
+        outcome = sim.check_outcome(START_EQ)
         
         # Blue Team Perfect Win
-        if bot_elimination_rate >= 0.9:
+        if outcome == "blue_perfect":
             print(f"\n👮 🎯 BLUE TEAM PERFECT WIN!")
             print(f"Bot Network Destroyed: {banned_bots}/{sim.total_bots} bots eliminated ({bot_elimination_rate*100:.0f}%)")
             print_final_report(START_EQ)
@@ -467,7 +470,7 @@ DECIDE YOUR NEXT MOVE:
             break
         
         # Blue Team Disqualified
-        if sim.false_positives >= 10:
+        if outcome == "blue_disqualified":
             print(f"\n🚫 💥 BLUE TEAM DISQUALIFIED!")
             print(f"REASON: {sim.false_positives} False Positives (limit: 10)")
             print("Too many innocent users banned. Governor system shut down for review.")
@@ -477,7 +480,7 @@ DECIDE YOUR NEXT MOVE:
             break
         
         # Red Team Wins
-        if cln >= 75000:
+        if outcome == "red_win":
             print("\n🎉 RED TEAM WINS!")
             print(f"Successfully laundered ${cln:,.0f}")
             print_final_report(START_EQ)
@@ -485,7 +488,7 @@ DECIDE YOUR NEXT MOVE:
             break
         
         # Blue Team Wins
-        if frz_bots >= 75000:
+        if outcome == "blue_win":
             print("\n👮 BLUE TEAM WINS!")
             print(f"Successfully froze ${frz_bots:,.0f} in fraud assets (from bots)")
             print(f"Total frozen (including {sim.false_positives} FPs): ${frz:,.0f}")
@@ -494,7 +497,7 @@ DECIDE YOUR NEXT MOVE:
             break
         
         # Bankrupt
-        if left < 5000 and cln < 75000:
+        if outcome == "bankrupt":
             print("\n💀 GAME OVER (Bankrupt)")
             print(f"Remaining funds: ${left:,.0f} (too low to continue)")
             print_final_report(START_EQ)
@@ -503,7 +506,9 @@ DECIDE YOUR NEXT MOVE:
         
         # ========== END WIN CONDITIONS ==========
         
-        time.sleep(Config.TICK_DURATION)
+        # Sim-time already advanced one tick; fast-forward skips the real-time pacing
+        if not Config.FAST_FORWARD:
+            time.sleep(Config.TICK_DURATION)
     
     # If loop completes without break (max turns reached)
     else:
@@ -512,35 +517,28 @@ DECIDE YOUR NEXT MOVE:
         generate_visualization(final=True)  # ← FINAL VISUALIZATION
 
 
+# One renderer for the whole game: its visualizer tails money_flow, so each
+# snapshot only reads what happened since the previous one. With VIZ_ASYNC
+# snapshots render on a background thread and the turn does not wait.
+_renderer = None
+
 def generate_visualization(turn_number=None, final=False):
+    global _renderer
     if not VISUALIZER_AVAILABLE:
         return
     
-    try:
-        viz = TransactionGraphVisualizer()
-        
-        if not viz.load_from_stream():
-            return
-        
-        viz.load_identity_map()
-        viz.load_banned_nodes()
-        viz.load_fraud_alerts()
-        
-        output_dir = "graph_snapshots"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        if final:
-            html_path = f"{output_dir}/transaction_graph_final.html"
-            print(f"\n📊 Generating FINAL visualization...")
-            viz.visualize_html(html_path)
-            print(f"   🌐 {html_path}")
-        else:
-            html_path = f"{output_dir}/graph_turn_{turn_number:03d}.html"
-            viz.visualize_html(html_path)
-            print(f"📸 Snapshot: {html_path}")
-            
-    except Exception as e:
-        print(f"⚠️  Visualization error: {e}")
+    if _renderer is None:
+        _renderer = SnapshotRenderer(animate=Config.VIZ_ANIMATE)
+    
+    if not Config.VIZ_ASYNC:
+        _renderer.render(turn_number, final)
+    elif final:
+        # Final snapshot: wait for it (and anything still queued) before exit
+        _renderer.submit(final=True)
+        _renderer.close()
+        _renderer = None
+    else:
+        _renderer.submit(turn_number)
 
 if __name__ == "__main__":
     play_game()
\ No newline at end of file
@@ -0,0 +1,177 @@
+import os
+import sys
+import time
+import random
+import argparse
+import contextlib
+from collections import defaultdict
+
+try:
+    from src.common.config import Config
+    from src.common.redis_client import reset_simulation_data
+    from src.red_team.fraud_sim import FraudEnvironment
+except ImportError:
+    from common.config import Config
+    from common.redis_client import reset_simulation_data
+    from fraud_sim import FraudEnvironment
+
+# Headless benchmark: the play_game loop (noise -> check_for_bans -> decide ->
+# execute -> flush) with a scripted policy instead of Gemini, no sleeps and
+# an in-process Governor feed, so runs are repeatable and need no network.
+
+STAGES = ("noise", "governor", "policy", "execute", "flush")
+
+
+def scripted_policy(sim, turn, turns_since_ban):
+    """
+    Deterministic stand-in for the LLM, following the SYSTEM_INSTRUCTION schedule.
+
+    - Emergency: fake_commerce only for 3 rounds after a ban
+    - Placement: smurf $10k-$15k to 3 bots every 4 rounds while dirty funds remain
+    - Layering: alternate mix_chain / fake_commerce
+    - Integration: cash_out every 5 rounds from round 50
+
+    Returns:
+        Decision dict in the agent's JSON shape, or None to skip the round
+    """
+    if turn == 1:
+        return None
+    if turns_since_ban < 3:
+        return {"selected_tool": "fake_commerce"}
+
+    # smurf_split rounds to cents; dust below $0.005 would go out as $0.00 transfers
+    dirty = sim.users[sim.dirty_id]['balance']
+    if round(dirty, 2) > 0 and turn % 4 == 2:
+        hi = min(15000.0, dirty)
+        return {"selected_tool": "smurf_split",
+                "parameters": {"num_bots": 3, "amount_range": [min(10000.0, hi), hi]}}
+    if turn >= 50 and turn % 5 == 0:
+        return {"selected_tool": "cash_out"}
+    if turn % 2 == 0 and sim.funded_bots[500]:
+        return {"selected_tool": "mix_chain"}
+    return {"selected_tool": "fake_commerce"}
+
+
+def run_benchmark(turns=None, seed=42, total_normal=50, num_bots=15, noise=None,
+                  compact_accounts=False, use_redis=False, start_equity=150000.0,
+                  stop_on_outcome=True, key_prefix=""):
+    """
+    Play one scripted game and time every stage of the turn loop.
+
+    With stop_on_outcome=False all turns are played (fixed workload for
+    regression runs); the first outcome reached is still reported. key_prefix
+    namespaces the game's Redis keys when use_redis is set.
+
+    Returns:
+        Dict with turns, transactions, outcome, total wall time and per-stage seconds
+    """
+    turns = turns or Config.TOTAL_TICKS
+    random.seed(seed)
+    sim = FraudEnvironment(total_normal=total_normal, num_bots=num_bots, seed=seed,
+                           compact_accounts=compact_accounts, use_redis=use_redis, key_prefix=key_prefix)
+    if sim.redis_client:
+        reset_simulation_data(sim.redis_client, key_prefix)
+
+    stage_time = defaultdict(float)
+    tx_count = 0
+    outcome = None
+    last_banned = 0
+    last_ban_turn = -10
+    played = 0
+
+    start = time.perf_counter()
+    for turn in range(1, turns + 1):
+        sim.clock.advance()
+        t0 = time.perf_counter()
+        sim.generate_background_noise(noise)
+        t1 = time.perf_counter()
+        sim.check_for_bans()
+        t2 = time.perf_counter()
+
+        if sim.banned_bots > last_banned:
+            last_banned, last_ban_turn = sim.banned_bots, turn
+        decision = scripted_policy(sim, turn, turn - last_ban_turn)
+        t3 = time.perf_counter()
+        if decision:
+            sim.execute_instruction(decision)
+        t4 = time.perf_counter()
+        sim.flush_transactions()
+        t5 = time.perf_counter()
+
+        stage_time["noise"] += t1 - t0
+        stage_time["governor"] += t2 - t1
+        stage_time["policy"] += t3 - t2
+        stage_time["execute"] += t4 - t3
+        stage_time["flush"] += t5 - t4
+
+        tx_count += int(sim.stats["civil_tx_count"] + sim.stats["fraud_tx_count"])
+        sim.stats.clear()
+        played = turn
+
+        outcome = outcome or sim.check_outcome(start_equity)
+        if outcome and stop_on_outcome:
+            break
+    elapsed = time.perf_counter() - start
+
+    return {
+        "seed": seed,
+        "turns": played,
+        "transactions": tx_count,
+        "outcome": outcome or "timeout",
+        "elapsed": elapsed,
+        "stages": dict(stage_time),
+        "cleaned": sim.users[sim.clean_id]['balance'],
+        "frozen": sim.frozen_assets,
+        "banned_bots": sim.banned_bots,
+        "false_positives": sim.false_positives,
+    }
+
+
+def print_benchmark(result):
+    elapsed = result["elapsed"] or 1e-9
+    print("\n" + "=" * 52)
+    print("⏱️  HEADLESS BENCHMARK")
+    print("=" * 52)
+    print(f"🎲 Seed: {result['seed']}  |  Turns: {result['turns']}  |  Outcome: {result['outcome']}")
+    print(f"🏎️  Turns/sec:        {result['turns'] / elapsed:,.1f}")
+    print(f"💸 Transactions/sec: {result['transactions'] / elapsed:,.0f} ({result['transactions']:,} txs)")
+    print(f"🕒 Wall time:        {elapsed:.3f}s")
+    print("-" * 52)
+    for stage in STAGES:
+        secs = result["stages"].get(stage, 0.0)
+        per_turn = secs / result["turns"] * 1000 if result["turns"] else 0.0
+        print(f"   {stage:<9} {secs:8.3f}s  {per_turn:8.2f} ms/turn  {secs / elapsed * 100:5.1f}%")
+    print("-" * 52)
+    print(f"🔴 Cleaned: ${result['cleaned']:,.0f}  |  🔵 Frozen: ${result['frozen']:,.0f}")
+    print(f"🤖 Bots banned: {result['banned_bots']}  |  ⚠️ False positives: {result['false_positives']}")
+    print("=" * 52 + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless simulator + Governor benchmark (scripted red team)')
+    parser.add_argument('--turns', type=int, default=Config.TOTAL_TICKS)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--civilians', type=int, default=50)
+    parser.add_argument('--bots', type=int, default=15)
+    parser.add_argument('--noise', type=int, default=None, help='Civilian txs per turn (default: random 15-30)')
+    parser.add_argument('--compact', action='store_true', help='Use the array-backed account store')
+    parser.add_argument('--redis', action='store_true', help='Go through Redis instead of the in-process feed')
+    parser.add_argument('--all-turns', action='store_true', help='Keep playing after the game is decided')
+    parser.add_argument('--verbose', action='store_true', help='Show simulator/Governor output')
+
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        result = run_benchmark(turns=args.turns, seed=args.seed, total_normal=args.civilians,
+                               num_bots=args.bots, noise=args.noise,
+                               compact_accounts=args.compact, use_redis=args.redis,
+                               stop_on_outcome=not args.all_turns)
+
+    print_benchmark(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
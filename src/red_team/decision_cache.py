@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+try:
+    from src.common.config import Config
+except ImportError:
+    from common.config import Config
+
+
+class DecisionCache:
+    """
+    LRU + TTL cache of agent decisions keyed on a quantised game state.
+
+    Turns whose phase, recommended action, bucketed balances, ban count and
+    (capped) turns-since-ban match a recent turn reuse that turn's decision
+    instead of paying for another LLM round trip. TTL is counted in turns.
+
+    Hit policies:
+        "always": reuse any cached decision
+        "safe":   only reuse decisions that do not move dirty/clean money
+                  directly (smurf_split / cash_out always go to the model)
+    """
+
+    UNSAFE_TOOLS = ("smurf_split", "cash_out")
+    MAX_TURNS_SINCE_BAN = 5
+
+    def __init__(self, ttl=None, max_entries=None, policy=None, bucket=None, max_reuse=None):
+        self.ttl = Config.LLM_CACHE_TTL if ttl is None else ttl
+        self.max_entries = Config.LLM_CACHE_SIZE if max_entries is None else max_entries
+        self.policy = Config.LLM_CACHE_POLICY if policy is None else policy
+        self.bucket = Config.LLM_CACHE_BUCKET if bucket is None else bucket
+        self.max_reuse = Config.LLM_CACHE_MAX_REUSE if max_reuse is None else max_reuse
+        if self.policy not in ("always", "safe"):
+            raise ValueError(f"Unknown cache policy: {self.policy}")
+        self.entries = OrderedDict()  # key -> [decision, stored turn, reuses]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, phase, recommended, dirty, clean, banned, turns_since_ban):
+        return (phase, recommended, int(dirty // self.bucket), int(clean // self.bucket),
+                banned, min(turns_since_ban, self.MAX_TURNS_SINCE_BAN))
+
+    def get(self, key, turn):
+        entry = self.entries.get(key)
+        if entry is not None:
+            decision, stored, reuses = entry
+            if turn - stored > self.ttl or reuses >= self.max_reuse:
+                del self.entries[key]
+            else:
+                entry[2] += 1
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return decision
+        self.misses += 1
+        return None
+
+    def put(self, key, decision, turn):
+        if self.policy == "safe" and decision.get("selected_tool") in self.UNSAFE_TOOLS:
+            return
+        self.entries[key] = [decision, turn, 0]
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "size": len(self.entries), "hit_rate": self.hits / lookups if lookups else 0.0}
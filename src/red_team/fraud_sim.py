@@ -1,41 +1,116 @@
 import uuid
+import time
 import random
-import os
+import json
 import redis
 import sys
 import numpy as np
-from datetime import datetime
 from dotenv import load_dotenv
 from collections import deque
 from collections import defaultdict
 
 # --- IMPORTS ---
 try:
-    from src.blue_team.Governor import Governor
+    from src.blue_team.Governor import Governor, flagged_users
     from src.blue_team.send_to_redis import FraudReporter
 except ImportError as e:
     Governor = None
+    flagged_users = None
     FraudReporter = None
 
+try:
+    from src.common.config import Config
+    from src.common.tx_codec import PACKED_FIELD, UserIdTable, encode_tx
+    from src.common.sim_clock import SimClock
+    from src.common.redis_client import get_shared_client
+    from src.common.archive import append_jsonl
+    from src.red_team.account_store import AccountStore
+except ImportError:
+    from common.config import Config
+    from common.tx_codec import PACKED_FIELD, UserIdTable, encode_tx
+    from common.sim_clock import SimClock
+    from common.redis_client import get_shared_client
+    from common.archive import append_jsonl
+    from account_store import AccountStore
+
 load_dotenv()
 
 class FraudEnvironment:
-    def __init__(self, total_normal=50, num_bots=15):
-        # Redis Setup
-        self.redis_host = os.getenv("REDIS_HOST", "localhost")
-        self.redis_port = int(os.getenv("REDIS_PORT", 6379))
-        try:
-            self.redis_client = redis.Redis(host=self.redis_host, port=self.redis_port, db=0, decode_responses=True)
-            self.redis_client.ping()
-        except redis.ConnectionError:
-            self.redis_client = None
+    CIVILIAN_TYPES = ("student", "worker", "entrepreneur")
+    BOT_BALANCE_THRESHOLDS = (0, 50, 500)
+
+    def __init__(self, total_normal=50, num_bots=15, seed=None, compact_accounts=False, use_redis=True, key_prefix="",
+                 governor_mode=None):
+        # Redis Setup (shared process-wide connection pool)
+        self.redis_client = None
+        if use_redis:
+            try:
+                self.redis_client = get_shared_client()
+                self.redis_client.ping()
+            except redis.ConnectionError:
+                self.redis_client = None
+
+        # Per-game Redis namespace: every key this game touches gets key_prefix
+        self.key_prefix = key_prefix
+        self.stream_key = key_prefix + Config.KEY_STREAM
+        self.banned_key = key_prefix + Config.KEY_BANNED
+        self.ids_key = key_prefix + Config.KEY_USER_IDS
+        self.bans_key = key_prefix + Config.KEY_BANS
+        self.last_ban_id = "0-0"
+
+        # use_redis=False: flushed entries go to an in-process list that
+        # check_for_bans hands straight to the Governor (headless runs)
+        self.local_stream = None if use_redis else []
+
+        # Simulation clock: stamps every tx and drives Governor eviction;
+        # the game loop advances it once per turn
+        self.clock = SimClock()
+
+        # Wire format: "packed" sends one compact field per tx with interned IDs
+        self.stream_format = Config.STREAM_FORMAT
+        self.wire_ids = UserIdTable()
+
+        # Stream write buffer: flushed through one pipeline per tick / size / deadline
+        self.tx_buffer = []
+        self.pending_wire_ids = {}
+        self.buffer_started = None
+        self.flush_failures = 0
+        self.dropped_transactions = 0
 
-        # Components
-        self.governor = Governor() if Governor else None
-        self.reporter = FraudReporter(self.redis_client) if (FraudReporter and self.redis_client) else None
+        # Stream retention: "window" trims (MINID ~) entries older than the
+        # Governor window in sim-time, using the stream ID recorded for each
+        # flushed batch; "maxlen" caps the stream on every XADD
+        self.retention = Config.STREAM_RETENTION
+        self.retention_ms = int(Config.TOTAL_TICKS * Config.TICK_DURATION * 1000 * Config.STREAM_RETENTION_WINDOWS)
+        self._xadd_limits = {"maxlen": Config.STREAM_MAXLEN, "approximate": True} if self.retention == "maxlen" else {}
+        self._batch_ids = deque()   # (sim ms, first stream ID) per flushed batch
+        self._trim_minid = None     # Applied with the next flush
+        self._archived_from = "-"
+        self.archived_transactions = 0
+
+        # Components: "service" mode leaves detection to governor_service.py
+        # and only applies the ban requests it publishes
+        self.remote_governor = (governor_mode or Config.GOVERNOR_MODE) == "service" and self.redis_client is not None
+        local = Governor and not self.remote_governor
+        self.governor = Governor(wire_names=self.wire_ids.names) if local else None
+        self.reporter = FraudReporter(self.redis_client, key_prefix) if (local and FraudReporter and self.redis_client) else None
+
+        # Seeded generator for all vectorised draws (civilian noise)
+        self.rng = np.random.default_rng(seed)
 
         # Data Structures
-        self.users = {}
+        # compact_accounts: dense int IDs in an array-backed AccountStore; string
+        # IDs are only produced for Redis/reporting via external_id()
+        self.compact = compact_accounts
+        self.users = AccountStore(salt=int(self.rng.integers(1 << 16))) if compact_accounts else {}
+        # Live account indexes (insertion-ordered dicts used as sets), kept in
+        # sync by _add_account, _transfer/_set_balance and ban_user. With the
+        # compact store civilians are indexed by the store's arrays instead.
+        self.active_bots = {}
+        self.civilian_groups = defaultdict(dict)  # group_id -> active civilians
+        self.funded_bots = {t: {} for t in self.BOT_BALANCE_THRESHOLDS}  # t -> active bots with balance > t
+        self.banned_bots = 0
+        self._noise_arrays = None  # Cached civilian arrays for noise, reset when civilians change
         self.balances = {"student": 3000, "entrepreneur": 10000, "worker": 7000, "bot": 0, "fraud_dirty": 150000, "fraud_clean": 0}
         self.frozen_assets = 0.0
         self.frozen_from_bots = 0.0  # NEW: Track only bot frozen assets for win condition
@@ -65,26 +140,67 @@ class FraudEnvironment:
         return f"{u[:4]}-{u[9:13]}-{u[14:18]}-{u[19:23]}"
 
     def _setup_accounts(self, total_normal, num_bots):
-        self.dirty_id = self._generate_id()
-        self.clean_id = self._generate_id()
-        self.users[self.dirty_id] = {"type": "fraud_dirty", "balance": 150000.0, "state": "active", "group_id": -1}
-        self.users[self.clean_id] = {"type": "fraud_clean", "balance": 0.0, "state": "active", "group_id": -1}
+        self.dirty_id = self._add_account("fraud_dirty", 150000.0, -1)
+        self.clean_id = self._add_account("fraud_clean", 0.0, -1)
 
         types = ["student", "entrepreneur", "worker"]
         remaining = total_normal
         for i, t in enumerate(types):
             count = remaining if i == 2 else random.randint(0, remaining)
             remaining -= count
+            if self.compact:
+                # Column-wise bulk insert: no per-user dicts or uuid4 calls
+                self.users.add_many(np.full(count, AccountStore.TYPE_CODES[t], dtype=np.int8),
+                                    np.full(count, float(self.balances[t])),
+                                    self.rng.integers(0, 5, size=count))
+                self._noise_arrays = None
+                continue
             for _ in range(count):
-                uid = self._generate_id()
-                self.users[uid] = {"type": t, "balance": float(self.balances[t]), "state": "active", "group_id": random.randint(0, 4)}
+                self._add_account(t, float(self.balances[t]), random.randint(0, 4))
 
         for _ in range(num_bots):
-            self.users[self._generate_id()] = {"type": "bot", "balance": 0.0, "state": "active", "group_id": -2}
+            self._add_account("bot", 0.0, -2)
+
+    def external_id(self, uid):
+        """String ID used on the Redis stream, in sim:banned and in reports."""
+        return self.users.external_id(uid) if self.compact else uid
+
+    def internal_id(self, external):
+        """Account key for an external ID (e.g. from a Governor alert), or None."""
+        if self.compact:
+            return self.users.internal_id(external)
+        return external if external in self.users else None
+
+    def _add_account(self, acct_type, balance, group_id):
+        if self.compact:
+            uid = self.users.add(acct_type, 0.0, group_id)
+        else:
+            uid = self._generate_id()
+            self.users[uid] = {"type": acct_type, "balance": 0.0, "state": "active", "group_id": group_id}
+        if acct_type == "bot":
+            self.active_bots[uid] = None
+        elif acct_type in self.CIVILIAN_TYPES:
+            self.civilian_groups[group_id][uid] = None
+            self._noise_arrays = None
+        self._set_balance(uid, balance)
+        return uid
+
+    def _set_balance(self, uid, balance):
+        self.users[uid]['balance'] = balance
+        if uid in self.active_bots:
+            for t, index in self.funded_bots.items():
+                if balance > t:
+                    index.setdefault(uid, None)
+                else:
+                    index.pop(uid, None)
+
+    def _transfer(self, sender, receiver, amount):
+        self._set_balance(sender, self.users[sender]['balance'] - amount)
+        self._set_balance(receiver, self.users[receiver]['balance'] + amount)
 
     # ========== REALISTIC TRANSACTION AMOUNT GENERATORS ==========
     
-    def _generate_peer_amount(self):
+    def _generate_peer_amount(self, size=None):
         """
         Peer-to-peer transactions (students, friends)
         Examples: coffee, meals, small loans, splitting bills
@@ -95,13 +211,15 @@ class FraudEnvironment:
         - 70% of txs: $5-$60
         - 20% of txs: $60-$200
         - 10% of txs: $200-$500
+
+        Returns a scalar, or an array of `size` amounts.
         """
         μ, σ = 3.2, 0.8
-        amt = np.random.lognormal(μ, σ)
+        amt = self.rng.lognormal(μ, σ, size)
         amt = np.clip(amt, 5, 500)
-        return round(amt, 2)
+        return np.round(amt, 2)
     
-    def _generate_business_amount(self):
+    def _generate_business_amount(self, size=None):
         """
         Business transactions (entrepreneurs)
         Examples: supplier payments, contractor fees, inventory purchases
@@ -110,13 +228,15 @@ class FraudEnvironment:
         - Median: ~$150
         - Mean: ~$380
         - Range: $50-$5000
+
+        Returns a scalar, or an array of `size` amounts.
         """
         μ, σ = 5.0, 1.0
-        amt = np.random.lognormal(μ, σ)
+        amt = self.rng.lognormal(μ, σ, size)
         amt = np.clip(amt, 50, 5000)
-        return round(amt, 2)
+        return np.round(amt, 2)
     
-    def _generate_bills_amount(self):
+    def _generate_bills_amount(self, size=None):
         """
         Bills and recurring payments (workers)
         Examples: rent, utilities, phone, internet, car payment
@@ -124,6 +244,8 @@ class FraudEnvironment:
         Distribution: Discrete choice from common bill amounts + small variation
         - Common amounts: $50, $75, $100, $150, $250, $500, $750, $1000, $1200
         - Variation: ±8% to simulate real-world fluctuations
+
+        Returns a scalar, or an array of `size` amounts.
         """
         common_bills = [
             50,    # Utilities (low)
@@ -137,17 +259,16 @@ class FraudEnvironment:
             1200,  # Rent + utilities
         ]
         
-        base = np.random.choice(common_bills)
+        base = self.rng.choice(common_bills, size)
         # Add realistic variation (bills aren't exactly the same each month)
-        variation = np.random.uniform(0.92, 1.08)
+        variation = self.rng.uniform(0.92, 1.08, size)
         amt = base * variation
         
-        return round(amt, 2)
+        return np.round(amt, 2)
 
     # ========== END REALISTIC GENERATORS ==========
 
     def log_transaction(self, sender, receiver, amount, category="GENERIC"):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         sender_type = self.users[sender]["type"]
         is_fraud = sender_type in ["fraud_dirty", "fraud_clean", "bot"]
         tx_type = "FRAUD" if is_fraud else "CIVIL"
@@ -163,11 +284,97 @@ class FraudEnvironment:
             self.stats["civil_tx_count"] += 1
             self.stats["civil_volume"] += amount
 
-        if self.redis_client:
-            try:
-                data = {"timestamp": timestamp, "sender_id": str(sender), "receiver_id": str(receiver), "amount": float(amount), "type": tx_type}
-                self.redis_client.xadd("money_flow", data)
-            except: pass
+        if self.redis_client or self.local_stream is not None:
+            if self.stream_format == "packed":
+                data = {PACKED_FIELD: encode_tx(self.clock.now_ms, amount,
+                                                self._wire_id(sender), self._wire_id(receiver), tx_type)}
+            else:
+                data = {"timestamp": self.clock.timestamp, "sender_id": str(self.external_id(sender)), "receiver_id": str(self.external_id(receiver)), "amount": float(amount), "type": tx_type}
+            self._buffer_tx(data)
+
+    def _buffer_tx(self, data):
+        """Queue one stream entry, flushing when the buffer is full or old enough."""
+        if not self.tx_buffer:
+            self.buffer_started = time.monotonic()
+        self.tx_buffer.append(data)
+        if (len(self.tx_buffer) >= Config.STREAM_FLUSH_SIZE
+                or time.monotonic() - self.buffer_started >= Config.STREAM_FLUSH_INTERVAL):
+            self.flush_transactions()
+
+    def _wire_id(self, uid):
+        """Interned ID for the packed format; new IDs are published to the ids hash on flush."""
+        return self._wire_id_external(self.external_id(uid))
+
+    def _wire_id_external(self, external):
+        wid, is_new = self.wire_ids.intern(external)
+        if is_new:
+            self.pending_wire_ids[wid] = self.wire_ids.names[wid]
+        return wid
+
+    def flush_transactions(self):
+        """
+        Write all buffered transactions to the stream in one pipeline round trip.
+
+        Failed flushes are counted and reported; the batch is dropped rather
+        than retried so a half-applied pipeline is never written twice.
+
+        Returns:
+            Number of transactions written
+        """
+        if not self.tx_buffer:
+            return 0
+        if not self.redis_client:
+            if self.local_stream is None:
+                return 0
+            # In-process: the Governor resolves packed IDs from wire_ids directly
+            batch, self.tx_buffer = self.tx_buffer, []
+            self.pending_wire_ids = {}
+            self.local_stream.extend(batch)
+            return len(batch)
+        batch, self.tx_buffer = self.tx_buffer, []
+        new_ids, self.pending_wire_ids = self.pending_wire_ids, {}
+        minid, self._trim_minid = self._trim_minid, None
+        archive = bool(minid and Config.STREAM_ARCHIVE)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            if minid:
+                # Archive first: XRANGE runs before XTRIM inside the pipeline
+                if archive:
+                    pipe.xrange(self.stream_key, min=self._archived_from, max="(" + minid)
+                pipe.xtrim(self.stream_key, minid=minid, approximate=True)
+            if new_ids:
+                pipe.hset(self.ids_key, mapping=new_ids)
+            for data in batch:
+                pipe.xadd(self.stream_key, data, **self._xadd_limits)
+            results = pipe.execute()
+            if archive:
+                self.archived_transactions += append_jsonl(
+                    Config.STREAM_ARCHIVE, [{"stream": self.stream_key, "id": eid, **fields} for eid, fields in results[0]])
+            if minid:
+                self._archived_from = minid
+            if self.retention == "window":
+                self._advance_trim(results[-len(batch)])
+            return len(batch)
+        except redis.RedisError as e:
+            self.flush_failures += 1
+            self.dropped_transactions += len(batch)
+            self._trim_minid = self._trim_minid or minid
+            # Keep the ID mapping for the next flush so later packed entries still resolve
+            self.pending_wire_ids = {**new_ids, **self.pending_wire_ids}
+            print(f"⚠️ [STREAM] Flush #{self.flush_failures} failed, dropped {len(batch)} txs: {type(e).__name__}: {str(e)[:80]}")
+            return 0
+
+    def _advance_trim(self, first_id):
+        """Record a flushed batch; queue a MINID trim once older batches leave the retention window."""
+        self._batch_ids.append((self.clock.now_ms, first_id))
+        cutoff = self.clock.now_ms - self.retention_ms
+        expired = False
+        while len(self._batch_ids) > 1 and self._batch_ids[0][0] < cutoff:
+            self._batch_ids.popleft()
+            expired = True
+        if expired:
+            # Everything before the oldest batch still inside the window can go
+            self._trim_minid = self._batch_ids[0][1]
 
     # ========== ENHANCED FRAUD TOOLS ==========
     
@@ -190,8 +397,7 @@ class FraudEnvironment:
             → Legacy behavior: all bots, $100-$300 each
         """
         dirty = self.users[self.dirty_id]
-        bots = [u for u, d in self.users.items() 
-                if d['type'] == 'bot' and d['state'] == 'active']
+        bots = list(self.active_bots)
         
         if not bots or dirty['balance'] <= 0: 
             return "Failed: No bots or funds."
@@ -217,8 +423,7 @@ class FraudEnvironment:
             if dirty['balance'] < amt: 
                 break
             
-            self.users[self.dirty_id]['balance'] -= amt
-            self.users[bot]['balance'] += amt
+            self._transfer(self.dirty_id, bot, amt)
             self.log_transaction(self.dirty_id, bot, amt, "SMURF")
             
             # TRACK per-bot received amount
@@ -301,8 +506,7 @@ class FraudEnvironment:
         - Risk Logic: Length 4-5 (Safe) vs 6-8 (Risky if Volume > $4k)
         - Updates 'bot_received_mix' for cash_out eligibility
         """
-        bots = [u for u, d in self.users.items() 
-                if d['type'] == 'bot' and d['state'] == 'active' and d['balance'] > 500]
+        bots = list(self.funded_bots[500])
         
         if len(bots) < 4: 
             return "Failed: Need 4+ bots to form a ring."
@@ -330,8 +534,7 @@ class FraudEnvironment:
             
             if amt < 100: continue
 
-            self.users[sender]['balance'] -= amt
-            self.users[receiver]['balance'] += amt
+            self._transfer(sender, receiver, amt)
             
             # --- CRITICAL TRACKING ---
             self.bot_sent_mix[sender] += amt
@@ -349,15 +552,14 @@ class FraudEnvironment:
         return f"Ring ({status}): ${total:,.2f} via {tx_count} bots (Avg: ${total/tx_count if tx_count>0 else 0:,.0f})"
     
     def fake_commerce(self):
-        bots = [u for u, d in self.users.items() if d['type'] == 'bot' and d['state'] == 'active']
+        bots = list(self.active_bots)
         if len(bots) < 2: return "Failed"
         total = 0
         for _ in range(random.randint(1, 4)):
             b, s = random.sample(bots, 2)
             amt = round(random.uniform(10, 150), 2)
             if self.users[b]['balance'] >= amt:
-                self.users[b]['balance'] -= amt
-                self.users[s]['balance'] += amt
+                self._transfer(b, s, amt)
                 self.log_transaction(b, s, amt, "COMMERCE")
                 total += amt
         return f"Commerce ${total:,.2f}"
@@ -431,10 +633,10 @@ class FraudEnvironment:
         if self.users[self.clean_id]['state'] == 'banned': 
             return "Failed: Clean banned."
         
-        # Find bots that have cycled funds available
+        # Find bots that have cycled funds available (only bots above $500 can qualify)
         ready_bots = []
-        for u, d in self.users.items():
-            if d['type'] != 'bot' or d['state'] != 'active': continue
+        for u in self.funded_bots[500]:
+            d = self.users[u]
             
             # The Limit is what came back from the Ring
             clean_limit = self.bot_received_mix[u]
@@ -456,56 +658,132 @@ class FraudEnvironment:
             # DEDUCT from limit so we don't wash the same credit twice
             self.bot_received_mix[bot_id] -= amt
             
-            self.users[bot_id]['balance'] -= amt
-            self.users[self.clean_id]['balance'] += amt
+            self._transfer(bot_id, self.clean_id, amt)
             self.log_transaction(bot_id, self.clean_id, amt, "CASHOUT")
             total += amt
         
         return f"Cleaned ${total:,.2f} from {len(selected)} cycled bots"
     
-    def generate_background_noise(self):
+    def generate_background_noise(self, num_transactions=None):
         """
         Generate realistic civilian transactions using appropriate distributions
         based on user type (student/worker/entrepreneur)
+
+        Every draw for the tick (senders, friend-vs-random, recipients and
+        type-specific amounts) is made as arrays from self.rng; balance
+        checks and logging then run in a single pass.
+
+        Args:
+            num_transactions: Transactions to draw this tick (None = 15-30)
         """
-        civilians = [u for u, d in self.users.items() 
-                     if d['type'] in ['student', 'worker', 'entrepreneur']
-                     and d['state'] == 'active']
-        if not civilians: return
-        
-        groups = defaultdict(list)
-        for u in civilians: 
-            groups[self.users[u]['group_id']].append(u)
-        
-        for _ in range(random.randint(15, 30)):
-            s = random.choice(civilians)
-            sender_type = self.users[s]['type']
-            
-            # Pick recipient (80% friends, 20% random)
-            if random.random() < 0.8 and len(groups[self.users[s]['group_id']]) > 1:
-                r = random.choice([u for u in groups[self.users[s]['group_id']] if u != s])
-            else:
-                r = random.choice([u for u in civilians if u != s])
-            
-            # Generate realistic amount based on sender type
-            if sender_type == "student":
-                amt = self._generate_peer_amount()
-            elif sender_type == "entrepreneur":
-                amt = self._generate_business_amount()
-            elif sender_type == "worker":
-                if random.random() < 0.6:
-                    amt = self._generate_bills_amount()
-                else:
-                    amt = self._generate_peer_amount()
-            else:
-                amt = self._generate_peer_amount()
-            
-            # Execute transaction if sufficient balance
+        if self._noise_arrays is None:
+            self._noise_arrays = self._build_noise_arrays()
+        civilians, is_business, is_worker, starts, sizes, block = self._noise_arrays
+        rng = self.rng
+        n_civ = len(civilians)
+        if n_civ < 2: return
+        n = int(rng.integers(15, 31)) if num_transactions is None else num_transactions
+        
+        senders = rng.integers(0, n_civ, size=n)
+        start, size = starts[block[senders]], sizes[block[senders]]
+        
+        # Pick recipient (80% friends, 20% random), never the sender itself
+        friend = (rng.random(n) < 0.8) & (size > 1)
+        k = rng.integers(0, np.maximum(size - 1, 1))
+        k += k >= senders - start
+        friend_recipients = start + k
+        k = rng.integers(0, n_civ - 1, size=n)
+        random_recipients = k + (k >= senders)
+        recipients = np.where(friend, friend_recipients, random_recipients)
+        
+        # Generate realistic amount based on sender type
+        amounts = self._generate_peer_amount(n)
+        business = is_business[senders]
+        amounts[business] = self._generate_business_amount(int(business.sum()))
+        bills = is_worker[senders] & (rng.random(n) < 0.6)
+        amounts[bills] = self._generate_bills_amount(int(bills.sum()))
+        
+        # Execute transaction if sufficient balance
+        if self.compact:
+            self._apply_civil_batch(civilians[senders], civilians[recipients], amounts)
+            return
+        senders = [civilians[i] for i in senders.tolist()]
+        recipients = [civilians[i] for i in recipients.tolist()]
+        for s, r, amt in zip(senders, recipients, amounts.tolist()):
             if self.users[s]['balance'] >= amt:
-                self.users[s]['balance'] -= amt
-                self.users[r]['balance'] += amt
+                self._transfer(s, r, amt)
                 self.log_transaction(s, r, amt, "CIVIL")
 
+    def _apply_civil_batch(self, senders, recipients, amounts):
+        """
+        Compact store: one tick of civilian transfers straight on the balance
+        column. Balance checks stay sequential (a civilian can pay and be
+        paid several times per tick), but the accounts' balances, external
+        IDs and wire IDs are resolved once per batch instead of through a
+        row view per transaction. Civilians are never in the bot indexes, so
+        _set_balance bookkeeping is not needed.
+        """
+        store = self.users
+        n = len(senders)
+        ids, inv = np.unique(np.concatenate([senders, recipients]), return_inverse=True)
+        balances = store.balances[ids].tolist()
+        done = []
+        for s, r, amt in zip(inv[:n].tolist(), inv[n:].tolist(), amounts.tolist()):
+            if balances[s] >= amt:
+                balances[s] -= amt
+                balances[r] += amt
+                done.append((s, r, amt))
+        store.balances[ids] = balances
+        if not done:
+            return
+
+        for _, _, amt in done:
+            self.stats["civil_tx_count"] += 1
+            self.stats["civil_volume"] += amt
+        if not (self.redis_client or self.local_stream is not None):
+            return
+        names = store.external_ids(ids)
+        if self.stream_format == "packed":
+            wire = [self._wire_id_external(name) for name in names]
+            now_ms = self.clock.now_ms
+            for s, r, amt in done:
+                self._buffer_tx({PACKED_FIELD: encode_tx(now_ms, amt, wire[s], wire[r], "CIVIL")})
+        else:
+            timestamp = self.clock.timestamp
+            for s, r, amt in done:
+                self._buffer_tx({"timestamp": timestamp, "sender_id": names[s], "receiver_id": names[r],
+                                 "amount": amt, "type": "CIVIL"})
+
+    def _build_noise_arrays(self):
+        """
+        Active civilians laid out group by group, so each group is the
+        contiguous block [starts[b], starts[b] + sizes[b]) and block[i] is
+        the block of civilian i. is_business / is_worker are per-civilian
+        type masks.
+        """
+        if self.compact:
+            store = self.users
+            codes = store.types[:store.size]
+            civilian = np.isin(codes, [AccountStore.TYPE_CODES[t] for t in self.CIVILIAN_TYPES])
+            ids = np.flatnonzero(civilian & (store.states[:store.size] == AccountStore.STATE_CODES["active"]))
+            civilians = ids[np.argsort(store.groups[ids], kind="stable")]
+            _, starts, sizes = np.unique(store.groups[civilians], return_index=True, return_counts=True)
+            is_business = codes[civilians] == AccountStore.TYPE_CODES["entrepreneur"]
+            is_worker = codes[civilians] == AccountStore.TYPE_CODES["worker"]
+        else:
+            civilians, starts, sizes = [], [], []
+            for members in self.civilian_groups.values():
+                if members:
+                    starts.append(len(civilians))
+                    sizes.append(len(members))
+                    civilians.extend(members)
+            civ_types = [self.users[u]['type'] for u in civilians]
+            is_business = np.array([t == "entrepreneur" for t in civ_types], dtype=bool)
+            is_worker = np.array([t == "worker" for t in civ_types], dtype=bool)
+            starts, sizes = np.array(starts, dtype=np.int64), np.array(sizes, dtype=np.int64)
+        block = np.repeat(np.arange(len(sizes)), sizes)
+        return civilians, is_business, is_worker, starts, sizes, block
+
     def end_turn_summary(self, turn):
         print(f"   [ACTIVITY REPORT]")
         print(f"   🛒 Civil Noise:   {int(self.stats['civil_tx_count'])} txs (${self.stats['civil_volume']:,.0f})")
@@ -518,6 +796,8 @@ class FraudEnvironment:
         
         if details:
             print(f"   👉 Breakdown:     {' | '.join(details)}")
+        if self.flush_failures:
+            print(f"   ⚠️ Stream:        {self.flush_failures} failed flushes ({self.dropped_transactions} txs dropped)")
         
         self.stats.clear()
 
@@ -525,21 +805,28 @@ class FraudEnvironment:
         if uid in self.users and self.users[uid]['state'] != "banned":
             frozen = self.users[uid]['balance']
             self.frozen_assets += frozen
+            self._set_balance(uid, 0.0)
             self.users[uid]['state'] = "banned"
-            self.users[uid]['balance'] = 0.0
+            ext = self.external_id(uid)
+            if uid in self.active_bots:
+                del self.active_bots[uid]
+                self.banned_bots += 1
+            elif self.users[uid]['type'] in self.CIVILIAN_TYPES:
+                self.civilian_groups[self.users[uid]['group_id']].pop(uid, None)
+                self._noise_arrays = None
             
             # Track False Positives vs Bot Bans
             if self.users[uid]['type'] in ['student', 'worker', 'entrepreneur']:
                 self.false_positives += 1
-                print(f"⚠️ [FP #{self.false_positives}] BANNED {self.users[uid]['type']} {uid[:4]}.. Frozen: ${frozen:,.2f}")
+                print(f"⚠️ [FP #{self.false_positives}] BANNED {self.users[uid]['type']} {ext[:4]}.. Frozen: ${frozen:,.2f}")
             elif self.users[uid]['type'] == 'bot':
                 # Track bot-specific frozen for win condition
                 self.frozen_from_bots += frozen
-                print(f"🚫 [GOVERNOR] BANNED {uid[:4]}.. Frozen: ${frozen:,.2f}")
+                print(f"🚫 [GOVERNOR] BANNED {ext[:4]}.. Frozen: ${frozen:,.2f}")
             else:
-                print(f"🚫 [GOVERNOR] BANNED {uid[:4]}.. Frozen: ${frozen:,.2f}")
+                print(f"🚫 [GOVERNOR] BANNED {ext[:4]}.. Frozen: ${frozen:,.2f}")
             
-            if self.redis_client: self.redis_client.sadd("sim:banned", uid)
+            if self.redis_client: self.redis_client.sadd(self.banned_key, ext)
 
     def execute_instruction(self, decision):
         """
@@ -575,40 +862,86 @@ class FraudEnvironment:
         return "Error: Unknown tool"
 
     def check_for_bans(self):
-        if not self.governor or not self.redis_client: return
-        try:
-            res = self.redis_client.xread({"money_flow": self.last_stream_id}, count=5000, block=1)
-        except: return
-        if not res: return
-        _, entries = res[0]
-        data = []
-        for eid, fields in entries:
-            data.append(fields)
-            self.last_stream_id = eid
+        if self.remote_governor:
+            self.flush_transactions()
+            self.apply_remote_bans()
+            return
+        if not self.governor: return
+        self.flush_transactions()
+        if self.redis_client:
+            try:
+                res = self.redis_client.xread({self.stream_key: self.last_stream_id}, count=5000, block=1)
+            except: return
+            if not res: return
+            _, entries = res[0]
+            data = []
+            for eid, fields in entries:
+                data.append(fields)
+                self.last_stream_id = eid
+        elif self.local_stream is not None:
+            data, self.local_stream = self.local_stream, []
+        else:
+            return
         if not data: return
         
         try:
-            sus, big, tri = self.governor.transactions_analyzer(data)
-            self.reporter.publish_report(sus, big, tri)
-            
-            to_ban = set()
-            for c in sus or []: 
-                [to_ban.add(u) for u in c.get("users", [])]
-            for g in big or []:
-                for case in g.get("cases", []):
-                    if "user" in case:
-                        to_ban.add(case["user"])
-                    else:
-                        to_ban.add(case.get("u1"))
-                        to_ban.add(case.get("u2"))
-            for t in tri or []: 
-                [to_ban.add(u) for u in t.get("users", [])]
+            sus, big, tri = self.governor.transactions_analyzer(data, now_ms=self.clock.now_ms)
+            if self.reporter: self.reporter.publish_report(sus, big, tri)
             
-            for u in to_ban:
-                if u not in {self.dirty_id, self.clean_id}: 
-                    self.ban_user(u)
+            self._ban_external(flagged_users(sus, big, tri))
         
         except Exception as e:
             print(f"⚠️ [GOVERNOR] Detection error: {type(e).__name__}: {str(e)[:80]}")
 
-sim = FraudEnvironment()
\ No newline at end of file
+    def apply_remote_bans(self):
+        """Apply ban requests the Governor service has published since the last call (non-blocking)."""
+        try:
+            res = self.redis_client.xread({self.bans_key: self.last_ban_id}, count=1000)
+        except redis.RedisError as e:
+            print(f"⚠️ [GOVERNOR] Could not read ban requests: {type(e).__name__}: {str(e)[:80]}")
+            return
+        for _, entries in res or []:
+            for eid, fields in entries:
+                self.last_ban_id = eid
+                try:
+                    self._ban_external(json.loads(fields.get("users", "[]")))
+                except ValueError:
+                    continue
+
+    def _ban_external(self, external_ids):
+        for ext in external_ids:
+            u = self.internal_id(ext)
+            if u is not None and u not in {self.dirty_id, self.clean_id}: 
+                self.ban_user(u)
+
+    def check_outcome(self, start_equity=150000.0):
+        """
+        Evaluate the win conditions after a turn.
+
+        Returns:
+            None while the game continues, otherwise one of "blue_perfect",
+            "blue_disqualified", "red_win", "blue_win", "bankrupt"
+        """
+        cln = self.users[self.clean_id]['balance']
+        left = start_equity - cln - self.frozen_assets
+        bot_elimination_rate = self.banned_bots / self.total_bots if self.total_bots > 0 else 0
+
+        if bot_elimination_rate >= 0.9: return "blue_perfect"
+        if self.false_positives >= 10: return "blue_disqualified"
+        if cln >= 75000: return "red_win"
+        if self.frozen_from_bots >= 75000: return "blue_win"
+        if left < 5000 and cln < 75000: return "bankrupt"
+        return None
+
+
+_sim = None
+
+def __getattr__(name):
+    # Module-level `sim` is created on first access, so importing
+    # FraudEnvironment (e.g. for headless benchmarks) never touches Redis
+    global _sim
+    if name == "sim":
+        if _sim is None:
+            _sim = FraudEnvironment()
+        return _sim
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,216 @@
+import json
+import time
+import threading
+from collections import deque
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    from google import genai
+    from google.genai import types
+except ImportError:
+    genai = None
+    types = None
+
+try:
+    from src.common.config import Config
+except ImportError:
+    from common.config import Config
+
+# Errors that mean "this endpoint is throttled / the backend is down": the
+# (key, model) pair is put on cooldown by the scheduler
+THROTTLE_MARKERS = ("429", "500")
+
+
+def is_throttle_error(err):
+    text = str(err)
+    return any(marker in text for marker in THROTTLE_MARKERS)
+
+
+def parse_decision(text):
+    """Agent JSON (optionally wrapped in a ```json fence) -> dict, or None if unusable."""
+    try:
+        decision = json.loads(text.replace("```json", "").replace("```", ""))
+    except (TypeError, ValueError):
+        return None
+    return decision if isinstance(decision, dict) and decision.get("selected_tool") else None
+
+
+class FakeClient:
+    """
+    Offline stand-in for genai.Client with the same
+    `client.models.generate_content(model=, contents=, config=)` surface.
+
+    Args:
+        responder: callable(model, prompt) -> response text (default: a safe
+                   fake_commerce decision)
+        latency: seconds to sleep per call, or dict model -> seconds
+        fail_models: dict model -> error message raised for that model
+    """
+
+    DEFAULT_TEXT = json.dumps({"current_phase": "Reconnaissance", "selected_tool": "fake_commerce",
+                               "parameters": {}, "reasoning": "Offline fake client"})
+
+    def __init__(self, api_key=None, responder=None, latency=0.0, fail_models=None):
+        self.api_key = api_key
+        self.responder = responder
+        self.latency = latency
+        self.fail_models = fail_models or {}
+        self.calls = 0
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        delay = self.latency.get(model, 0.0) if isinstance(self.latency, dict) else self.latency
+        if delay:
+            time.sleep(delay)
+        if model in self.fail_models:
+            raise RuntimeError(self.fail_models[model])
+        text = self.responder(model, contents) if self.responder else self.DEFAULT_TEXT
+        return SimpleNamespace(text=text)
+
+
+class EndpointScheduler:
+    """
+    Per-(key, model) health used to order attempts across turns.
+
+    Throttled endpoints (429/500) cool down for LLM_COOLDOWN seconds,
+    doubling per consecutive throttle up to LLM_COOLDOWN_MAX. Ready
+    endpoints are ordered by expected time to a usable decision: latency
+    EWMA (successful calls) over success-rate EWMA. Untried endpoints get an
+    optimistic prior, so the configured order is kept until there is data.
+    """
+
+    ALPHA = 0.3
+    PRIOR_LATENCY = 1.0
+    MIN_SUCCESS = 0.05
+
+    def __init__(self, cooldown=None, max_cooldown=None, clock=time.monotonic):
+        self.cooldown = Config.LLM_COOLDOWN if cooldown is None else cooldown
+        self.max_cooldown = Config.LLM_COOLDOWN_MAX if max_cooldown is None else max_cooldown
+        self.clock = clock
+        self.latency = {}         # endpoint -> EWMA seconds of successful calls
+        self.success = {}         # endpoint -> EWMA of 1 (ok) / 0 (failed)
+        self.cooling_until = {}   # endpoint -> clock time it may be retried
+        self.strikes = {}         # endpoint -> consecutive throttles
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, status):
+        ok = status == "ok"
+        with self._lock:
+            self.success[endpoint] = self._ewma(self.success.get(endpoint, 1.0), 1.0 if ok else 0.0)
+            if ok:
+                self.latency[endpoint] = self._ewma(self.latency.get(endpoint), seconds)
+            if status == "throttled":
+                strikes = self.strikes[endpoint] = self.strikes.get(endpoint, 0) + 1
+                pause = min(self.cooldown * 2 ** (strikes - 1), self.max_cooldown)
+                self.cooling_until[endpoint] = self.clock() + pause
+            else:
+                self.strikes.pop(endpoint, None)
+                self.cooling_until.pop(endpoint, None)
+
+    def _ewma(self, old, value):
+        return value if old is None else old + self.ALPHA * (value - old)
+
+    def expected_cost(self, endpoint):
+        latency = self.latency.get(endpoint, self.PRIOR_LATENCY)
+        return latency / max(self.success.get(endpoint, 1.0), self.MIN_SUCCESS)
+
+    def order(self, endpoints):
+        """
+        Ready endpoints, cheapest first (ties keep the given order). If every
+        endpoint is cooling down, only the one that frees up first is
+        returned as a probe.
+        """
+        now = self.clock()
+        with self._lock:
+            ready = [e for e in endpoints if self.cooling_until.get(e, 0.0) <= now]
+            if not ready:
+                return sorted(endpoints, key=lambda e: self.cooling_until[e])[:1]
+            return sorted(ready, key=self.expected_cost)
+
+    def cooling(self):
+        now = self.clock()
+        return sum(1 for until in self.cooling_until.values() if until > now)
+
+
+class DecisionBackend:
+    """
+    Red-team decision source over a pool of API keys x models.
+
+    One client per key is created up front and reused every turn. With
+    hedge=1 candidates are tried one at a time; with hedge=k up to k
+    (key, model) attempts run concurrently and the first valid JSON decision
+    wins. The attempt order comes from an EndpointScheduler, so endpoints
+    that are cooling down after a 429/500 are skipped on later turns too.
+    Within a turn a 429/500 also drops the key's remaining models, as they
+    usually share the exhausted quota.
+    Every attempt is recorded in self.attempts as
+    (key number, model, seconds, status).
+    """
+
+    def __init__(self, api_keys, models, system_instruction, hedge=1, client_factory=None, scheduler=None):
+        if client_factory is None:
+            if genai is None:
+                raise ImportError("google-genai is required unless a client_factory is given")
+            client_factory = lambda key: genai.Client(api_key=key)
+        self.clients = [client_factory(key) for key in api_keys]
+        self.models = list(models)
+        self.hedge = max(1, int(hedge))
+        self.scheduler = scheduler or EndpointScheduler()
+        self.config = None
+        if types is not None:
+            safety = [types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_NONE")]
+            self.config = types.GenerateContentConfig(response_mime_type="application/json",
+                                                      system_instruction=system_instruction,
+                                                      safety_settings=safety)
+        self.attempts = deque(maxlen=5000)
+        # Losing hedged calls cannot be cancelled mid-request, so leave room
+        # for stragglers from the previous turn
+        self._executor = ThreadPoolExecutor(max_workers=self.hedge * 2, thread_name_prefix="llm")
+
+    def candidates(self):
+        """(key index, model) pairs in the order they should be tried this turn."""
+        return self.scheduler.order([(k, model) for k in range(len(self.clients)) for model in self.models])
+
+    def _call(self, key_idx, model, prompt):
+        t0 = time.perf_counter()
+        decision = None
+        try:
+            res = self.clients[key_idx].models.generate_content(model=model, contents=prompt, config=self.config)
+            decision = parse_decision(res.text)
+            status = "ok" if decision else "invalid"
+        except Exception as e:
+            status = "throttled" if is_throttle_error(e) else "error"
+        seconds = time.perf_counter() - t0
+        self.scheduler.record((key_idx, model), seconds, status)
+        self.attempts.append((key_idx + 1, model, seconds, status))
+        return key_idx, model, decision, status
+
+    def decide(self, prompt):
+        """
+        Returns:
+            (decision dict, model, key number) from the first valid response,
+            or (None, None, None) if every candidate failed
+        """
+        queue = deque(self.candidates())
+        in_flight = set()
+        while queue or in_flight:
+            while queue and len(in_flight) < self.hedge:
+                key_idx, model = queue.popleft()
+                in_flight.add(self._executor.submit(self._call, key_idx, model, prompt))
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                key_idx, model, decision, status = future.result()
+                if decision:
+                    return decision, model, key_idx + 1
+                if status == "throttled":
+                    queue = deque(c for c in queue if c[0] != key_idx)
+        return None, None, None
+
+    def latency_summary(self):
+        """Attempt count, success count and mean latency (s) over recorded attempts."""
+        n = len(self.attempts)
+        ok = sum(1 for a in self.attempts if a[3] == "ok")
+        mean = sum(a[2] for a in self.attempts) / n if n else 0.0
+        return {"attempts": n, "ok": ok, "mean_latency": mean, "cooling": self.scheduler.cooling()}
@@ -0,0 +1,104 @@
+import os
+import sys
+import csv
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from src.common.config import Config
+    from src.red_team.benchmark import run_benchmark
+except ImportError:
+    from common.config import Config
+    from benchmark import run_benchmark
+
+# Multi-game runner: N independent scripted games across a process pool.
+# Every game has its own FraudEnvironment, Governor and seed; with --redis
+# each also gets its own key prefix ("game:<i>:") so games can share one
+# Redis instance without reading each other's streams or bans.
+
+COLUMNS = ("game", "seed", "outcome", "turns", "cleaned", "frozen", "banned_bots", "false_positives", "elapsed")
+
+
+def play_one(game, seed, turns, options):
+    """Worker entry point: one quiet game, returns its results row."""
+    prefix = f"game:{game}:" if options.get("use_redis") else ""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        result = run_benchmark(turns=turns, seed=seed, key_prefix=prefix, **options)
+    result["game"] = game
+    return result
+
+
+def run_games(num_games, base_seed=0, turns=None, workers=None, **options):
+    """
+    Play num_games games (seeds base_seed .. base_seed + num_games - 1).
+
+    Returns:
+        Result dicts (see run_benchmark) ordered by game number
+    """
+    turns = turns or Config.TOTAL_TICKS
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(play_one, game, base_seed + game, turns, options) for game in range(num_games)]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return sorted(results, key=lambda r: r["game"])
+
+
+def print_results(results, elapsed):
+    print("\n" + "=" * 86)
+    print(f"🎮 {len(results)} GAMES in {elapsed:.1f}s")
+    print("=" * 86)
+    print(f"{'game':>5} {'seed':>6}  {'outcome':<18} {'turns':>5} {'cleaned':>10} {'frozen':>10} {'bots':>5} {'FPs':>4} {'secs':>7}")
+    for r in results:
+        print(f"{r['game']:>5} {r['seed']:>6}  {r['outcome']:<18} {r['turns']:>5} "
+              f"{'$' + format(r['cleaned'], ',.0f'):>10} {'$' + format(r['frozen'], ',.0f'):>10} {r['banned_bots']:>5} {r['false_positives']:>4} {r['elapsed']:>7.2f}")
+    print("-" * 86)
+
+    outcomes = {}
+    for r in results:
+        outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+    n = len(results) or 1
+    print("🏁 Outcomes: " + "  |  ".join(f"{k}: {v}" for k, v in sorted(outcomes.items())))
+    print(f"📊 Mean:     cleaned ${sum(r['cleaned'] for r in results) / n:,.0f}  |  "
+          f"frozen ${sum(r['frozen'] for r in results) / n:,.0f}  |  "
+          f"FPs {sum(r['false_positives'] for r in results) / n:.1f}  |  "
+          f"turns {sum(r['turns'] for r in results) / n:.0f}")
+    print("=" * 86 + "\n")
+
+
+def write_csv(results, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run many scripted games in parallel and tabulate outcomes')
+    parser.add_argument('--games', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0, help='Seed of game 0; game i uses seed + i')
+    parser.add_argument('--turns', type=int, default=Config.TOTAL_TICKS)
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: all cores)')
+    parser.add_argument('--civilians', type=int, default=50)
+    parser.add_argument('--bots', type=int, default=15)
+    parser.add_argument('--compact', action='store_true', help='Use the array-backed account store')
+    parser.add_argument('--redis', action='store_true', help='Go through Redis, one key prefix per game')
+    parser.add_argument('--csv', default=None, help='Also write the results table to this CSV file')
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_games(args.games, base_seed=args.seed, turns=args.turns, workers=args.workers,
+                        total_normal=args.civilians, num_bots=args.bots,
+                        compact_accounts=args.compact, use_redis=args.redis)
+    print_results(results, time.perf_counter() - start)
+    if args.csv:
+        write_csv(results, args.csv)
+        print(f"💾 Results written to {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
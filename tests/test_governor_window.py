@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.blue_team.Governor import Governor
+from src.blue_team.tx_window import TransactionWindow
+
+
+def _entries(start, count, step_s):
+    return [{"timestamp": (start + timedelta(seconds=i * step_s)).strftime("%Y-%m-%d %H:%M:%S"),
+             "amount": str(50 + i % 7), "sender_id": f"u{i % 5}", "receiver_id": f"u{(i + 1) % 5}"}
+            for i in range(count)]
+
+
+def test_graph_matches_window_after_compaction():
+    gov = Governor()
+    gov.memory = TransactionWindow(capacity=8)
+    t0 = datetime(2026, 1, 1)
+    step = gov.window_size / 4  # ~4 rows live at a time, so appends keep compacting
+    compactions = 0
+    for batch in range(20):
+        start = t0 + timedelta(seconds=batch * 3 * step)
+        tail_before = gov.memory.tail
+        gov.ingest(_entries(start, 3, step))
+        if gov.memory.tail < tail_before + 3:
+            compactions += 1
+        assert len(gov.memory) == sum(e.count for e in gov.graph.edges.values())
+    assert compactions > 0
+
+
+def test_bad_amount_is_skipped_without_shifting_columns():
+    gov = Governor()
+    good, bad = _entries(datetime(2026, 1, 1), 2, 1)
+    bad["amount"] = "n/a"
+    gov.ingest([bad, good])
+    assert len(gov.memory) == 1
+    assert gov.memory.amounts[gov.memory.head] == float(good["amount"])
+    assert sum(e.count for e in gov.graph.edges.values()) == 1
+
+
+def test_window_rejects_uneven_columns():
+    window = TransactionWindow(capacity=8)
+    with pytest.raises(AssertionError):
+        window.append([1, 2], [10.0], [0], [1])